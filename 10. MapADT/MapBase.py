@@ -1,9 +1,13 @@
-import collections
+import collections.abc
 
 
-class MapBase(collections.MutableMapping):
+class MapBase(collections.abc.MutableMapping):
     """Our own abstract base class that includes a nonpublic _Item class."""
 
+    # declared by subclasses so that wrappers such as ConcurrentTreeMap can pick a locking scheme
+    _reads_mutate = False   # lookups change internal state (e.g. splaying or a page cache)
+    _atomic_reads = False   # lookups read one immutable version published in a single assignment
+
     # -------------------- nested _Item class --------------------
     class _Item:
         """Lightweight composite to store key-value pairs as map items."""
@@ -0,0 +1,662 @@
+from array import array
+
+import MapBase
+
+
+class ArrayTreeMap(MapBase.MapBase):
+    """Sorted map implementation using an AVL tree stored in a pool of parallel arrays.
+
+    Node i is described by _keys[i], _values[i] and the typecode 'i' arrays
+    _left[i], _right[i], _parent[i] (-1 meaning no node) and _height[i].
+    Deleted slots are chained through _left into a free list and reused, so
+    an entry costs a few dozen bytes instead of a node, an item and the
+    positions created while navigating, and the cyclic garbage collector only
+    sees two lists instead of millions of small objects.
+
+    The bulk and batch operations of TreeMap are provided too. Those that
+    rebuild the tree renumber every slot, so existing positions and cursors
+    become invalid.
+    """
+
+    # -------------------- nested Position class --------------------
+    class Position:
+        """A lightweight handle on the pool slot of a single item."""
+        __slots__ = ('_container', '_index', '_key')
+
+        def __init__(self, container, index):
+            """Constructor should not be invoked by user."""
+            self._container = container
+            self._index = index
+            self._key = container._keys[index]
+
+        def key(self):
+            """Return key of map's key-value pair."""
+            return self._key
+
+        def value(self):
+            """Return value of map's key-value pair."""
+            return self._container._values[self._container._validate(self)]
+
+        def __eq__(self, other):
+            """Return True if other Position represents the same location."""
+            return type(other) is type(self) and other._container is self._container and other._index == self._index
+
+        def __ne__(self, other):
+            """Return True if other does not represents the same location."""
+            return not (self == other)
+
+    # -------------------- nested Cursor class --------------------
+    class Cursor:
+        """Reusable bidirectional cursor over the items of a map, in key order.
+
+        A fresh cursor sits before the first item. Moving past either end leaves
+        the cursor just outside the map, from where it can step back in.
+        Lookups and insertions leave a cursor usable; a deletion that removes the
+        item under it makes it raise ValueError until it is seeked again.
+        """
+        __slots__ = ('_map', '_index', '_key', '_at_end')
+
+        def __init__(self, container):
+            """Constructor should not be invoked by user. Use the map's cursor()."""
+            self._map = container
+            self._index = -1
+            self._key = None
+            self._at_end = False    # True if past the last item, False if before the first
+
+        def _move(self, i):
+            self._index = i
+            self._key = self._map._keys[i] if i != -1 else None
+            return self._current()
+
+        def _current(self):
+            i = self._index
+            if i == -1:
+                return None
+            t = self._map
+            if i >= len(t._keys) or t._keys[i] is not self._key:    # slot freed, reused or renumbered
+                raise ValueError('cursor is no longer valid')
+            return self._key, t._values[i]
+
+        def item(self):
+            """Return (key, value) pair under the cursor (or None if outside the map)."""
+            return self._current()
+
+        def seek(self, k):
+            """Move to the item with least key greater than or equal to k and return it."""
+            t = self._map
+            i = t._search(k)
+            if i != -1 and t._keys[i] < k:
+                i = t._after(i)
+            self._at_end = i == -1
+            return self._move(i)
+
+        def next(self):
+            """Move to the next item and return it (or None when moving past the last)."""
+            t = self._map
+            if self._index == -1:
+                if self._at_end or t._root == -1:
+                    return None
+                return self._move(t._first(t._root))
+            self._current()     # check validity
+            i = t._after(self._index)
+            self._at_end = i == -1
+            return self._move(i)
+
+        def prev(self):
+            """Move to the previous item and return it (or None when moving before the first)."""
+            t = self._map
+            if self._index == -1:
+                if not self._at_end or t._root == -1:
+                    return None
+                self._at_end = False
+                return self._move(t._last(t._root))
+            self._current()     # check validity
+            return self._move(t._before(self._index))
+
+    # -------------------- nonpublic utilities --------------------
+    def __init__(self):
+        """Create an empty map."""
+        self._keys = []
+        self._values = []
+        self._left = array('i')
+        self._right = array('i')
+        self._parent = array('i')
+        self._height = array('b')   # a "None" child has height 0, thus a leaf has height 1
+        self._root = -1
+        self._free = -1             # head of the chain of deleted slots
+        self._size = 0
+
+    def _validate(self, p):
+        """Return slot index of Position p, if it is valid."""
+        if not isinstance(p, self.Position):
+            raise TypeError('p must be proper Position type')
+        if p._container is not self:
+            raise ValueError('p does not belong to this container')
+        if p._index >= len(self._keys) or self._keys[p._index] is not p._key:  # slot freed, reused or renumbered
+            raise ValueError('p is no longer valid')
+        return p._index
+
+    def _make_position(self, i):
+        """Return Position instance for given slot (or None if no slot)."""
+        return self.Position(self, i) if i != -1 else None
+
+    def _new_slot(self, k, v, parent):
+        i = self._free
+        if i != -1:
+            self._free = self._left[i]
+            self._keys[i] = k
+            self._values[i] = v
+            self._left[i] = self._right[i] = -1
+            self._parent[i] = parent
+            self._height[i] = 1
+        else:
+            i = len(self._keys)
+            self._keys.append(k)
+            self._values.append(v)
+            self._left.append(-1)
+            self._right.append(-1)
+            self._parent.append(parent)
+            self._height.append(1)
+        self._size += 1
+        return i
+
+    def _free_slot(self, i):
+        self._keys[i] = self._values[i] = None      # release references to the item
+        self._left[i] = self._free
+        self._right[i] = self._parent[i] = -1
+        self._height[i] = 0
+        self._free = i
+        self._size -= 1
+
+    def _search(self, k):
+        """Return slot having key k, or last slot searched (or -1 if empty)."""
+        keys, left, right = self._keys, self._left, self._right
+        i, last = self._root, -1
+        while i != -1:
+            last = i
+            key = keys[i]
+            if k == key:
+                return i
+            i = left[i] if k < key else right[i]
+        return last
+
+    def _first(self, i):
+        left = self._left
+        while left[i] != -1:
+            i = left[i]
+        return i
+
+    def _last(self, i):
+        right = self._right
+        while right[i] != -1:
+            i = right[i]
+        return i
+
+    def _after(self, i):
+        """Return slot of the successor of slot i (or -1)."""
+        if self._right[i] != -1:
+            return self._first(self._right[i])
+        parent, right = self._parent, self._right
+        above = parent[i]
+        while above != -1 and i == right[above]:
+            i, above = above, parent[above]
+        return above
+
+    def _before(self, i):
+        """Return slot of the predecessor of slot i (or -1)."""
+        if self._left[i] != -1:
+            return self._last(self._left[i])
+        parent, left = self._parent, self._left
+        above = parent[i]
+        while above != -1 and i == left[above]:
+            i, above = above, parent[above]
+        return above
+
+    # -------------------- AVL balancing on slot indices --------------------
+    def _recompute_height(self, i):
+        hl = self._height[self._left[i]] if self._left[i] != -1 else 0
+        hr = self._height[self._right[i]] if self._right[i] != -1 else 0
+        self._height[i] = 1 + (hl if hl > hr else hr)
+
+    def _rotate(self, x):
+        """Rotate slot x above its parent."""
+        left, right, parent = self._left, self._right, self._parent
+        y = parent[x]
+        z = parent[y]
+        if x == left[y]:
+            b = right[x]
+            left[y] = b
+            right[x] = y
+        else:
+            b = left[x]
+            right[y] = b
+            left[x] = y
+        if b != -1:
+            parent[b] = y
+        parent[y] = x
+        parent[x] = z
+        if z == -1:
+            self._root = x
+        elif left[z] == y:
+            left[z] = x
+        else:
+            right[z] = x
+
+    def _tall_child(self, i, favorleft=False):  # parameter controls tiebreaker
+        l, r = self._left[i], self._right[i]
+        hl = self._height[l] if l != -1 else 0
+        hr = self._height[r] if r != -1 else 0
+        return l if hl + (1 if favorleft else 0) > hr else r
+
+    def _rebalance(self, i):
+        """Restore AVL balance from slot i up to the root."""
+        height, left, right = self._height, self._left, self._right
+        while i != -1:
+            old_height = height[i]
+            hl = height[left[i]] if left[i] != -1 else 0
+            hr = height[right[i]] if right[i] != -1 else 0
+            if hl - hr > 1 or hr - hl > 1:  # imbalance detected!
+                # trinode restructuring, setting i to the root of the result
+                child = self._tall_child(i)
+                grandchild = self._tall_child(child, child == left[i])
+                if (grandchild == left[child]) == (child == left[i]):
+                    self._rotate(child)     # single rotation
+                    i = child
+                else:
+                    self._rotate(grandchild)    # double rotation
+                    self._rotate(grandchild)
+                    i = grandchild
+                self._recompute_height(left[i])
+                self._recompute_height(right[i])
+            self._recompute_height(i)
+            if height[i] == old_height:     # has height changed?
+                return                      # no further changes needed
+            i = self._parent[i]
+
+    # -------------------- public accessors --------------------
+    def __len__(self):
+        """Return the number of items in the map."""
+        return self._size
+
+    def __getitem__(self, k):
+        """Return value associated with key k (raise KeyError if not found)."""
+        i = self._search(k)
+        if i == -1 or self._keys[i] != k:
+            raise KeyError('Key Error: ' + repr(k))
+        return self._values[i]
+
+    def first(self):
+        """Return the first Position in the map (or None if empty)."""
+        return self._make_position(self._first(self._root)) if self._size > 0 else None
+
+    def last(self):
+        """Return the last Position in the map (or None if empty)."""
+        return self._make_position(self._last(self._root)) if self._size > 0 else None
+
+    def before(self, p):
+        """Return the Position just before p in the natural order.
+
+        Return None if p is the first position.
+        """
+        return self._make_position(self._before(self._validate(p)))
+
+    def after(self, p):
+        """Return the Position just after p in the natural order.
+
+        Return None if p is the last position.
+        """
+        return self._make_position(self._after(self._validate(p)))
+
+    def find_position(self, k):
+        """Return position with key k, or else neighbour (or None if empty)."""
+        return self._make_position(self._search(k))
+
+    def find_min(self):
+        """Return (key, value) pair with minimum key (or None if empty)."""
+        if self._size == 0:
+            return None
+        i = self._first(self._root)
+        return self._keys[i], self._values[i]
+
+    def find_ge(self, k):
+        """Return (key, value) pair with least key greater than or equal to k.
+
+        Return None if there does not exists such a key.
+        """
+        i = self._search(k)
+        if i != -1 and self._keys[i] < k:
+            i = self._after(i)
+        return (self._keys[i], self._values[i]) if i != -1 else None
+
+    def find_range(self, start, stop, reverse=False):
+        """Iterate all (key, value) pairs such that start <= key < stop.
+
+        If start is None, iteration begins with minimum key of map.
+        If stop is None, iteration continues through the maximum key of map.
+        If reverse is True, pairs are reported in decreasing key order.
+        """
+        keys, values = self._keys, self._values
+        if self._size == 0:
+            return
+        if not reverse:
+            if start is None:
+                i = self._first(self._root)
+            else:
+                i = self._search(start)
+                if keys[i] < start:
+                    i = self._after(i)
+            while i != -1 and (stop is None or keys[i] < stop):
+                yield keys[i], values[i]
+                i = self._after(i)
+        else:
+            if stop is None:
+                i = self._last(self._root)
+            else:
+                i = self._search(stop)
+                if not keys[i] < stop:
+                    i = self._before(i)
+            while i != -1 and (start is None or not keys[i] < start):
+                yield keys[i], values[i]
+                i = self._before(i)
+
+    def __iter__(self):
+        """Generate an iteration of all keys in the map in order."""
+        for item in self.find_range(None, None):
+            yield item[0]
+
+    def __reversed__(self):
+        """Generate an iteration of all keys in the map in reverse order."""
+        for item in self.find_range(None, None, reverse=True):
+            yield item[0]
+
+    def cursor(self):
+        """Return a new Cursor positioned before the first item of the map."""
+        return self.Cursor(self)
+
+    # -------------------- public update methods --------------------
+    def __setitem__(self, k, v):
+        """Assign value v to key k, overwriting existing value if present."""
+        i = self._search(k)
+        if i == -1:
+            self._root = self._new_slot(k, v, -1)
+        elif self._keys[i] == k:
+            self._values[i] = v     # replace existing item value
+        else:
+            leaf = self._new_slot(k, v, i)
+            if self._keys[i] < k:
+                self._right[i] = leaf
+            else:
+                self._left[i] = leaf
+            self._rebalance(i)
+
+    def delete(self, p):
+        """Remove the item at given Position."""
+        self._delete(self._validate(p))
+
+    def _delete(self, i):
+        left, right, parent = self._left, self._right, self._parent
+        if left[i] != -1 and right[i] != -1:    # i has two children
+            replacement = self._last(left[i])
+            self._keys[i] = self._keys[replacement]
+            self._values[i] = self._values[replacement]
+            i = replacement
+        # now i has at most one child
+        child = left[i] if left[i] != -1 else right[i]
+        above = parent[i]
+        if child != -1:
+            parent[child] = above
+        if above == -1:
+            self._root = child
+        elif left[above] == i:
+            left[above] = child
+        else:
+            right[above] = child
+        self._free_slot(i)
+        self._rebalance(above)
+
+    def __delitem__(self, k):
+        """Remove item associated with key k (raise KeyError if not found)."""
+        i = self._search(k)
+        if i == -1 or self._keys[i] != k:
+            raise KeyError('Key Error: ' + repr(k))
+        self._delete(i)
+
+    # -------------------- bulk construction --------------------
+    @classmethod
+    def from_sorted(cls, items):
+        """Create a map from (key, value) pairs given in strictly increasing key order.
+
+        The tree is built perfectly balanced in O(n) time, without per-item searches.
+        """
+        t = cls()
+        items = list(items)
+        t._check_sorted(items)
+        t._build(items)
+        return t
+
+    def update_sorted(self, items):
+        """Insert (key, value) pairs given in strictly increasing key order in O(n + m) time.
+
+        Values of keys already present are overwritten. The tree is rebuilt
+        perfectly balanced, so existing positions become invalid.
+        """
+        incoming = list(items)
+        self._check_sorted(incoming)
+        self._build(self._merge_items(list(self.find_range(None, None)), incoming))
+
+    def merge(self, other):
+        """Return a new map holding the items of this map and of other in O(n + m) time.
+
+        Where both maps hold a key, the value from other is used.
+        """
+        result = type(self)()
+        result._build(self._merge_items(list(self.find_range(None, None)),
+                                        list(other.find_range(None, None))))
+        return result
+
+    @staticmethod
+    def _check_sorted(items):
+        """Raise ValueError unless the (key, value) pairs are in strictly increasing key order."""
+        for i in range(1, len(items)):
+            if not items[i - 1][0] < items[i][0]:
+                raise ValueError('items must be in strictly increasing key order')
+
+    @staticmethod
+    def _merge_items(a, b):
+        """Return merged list of two sorted (key, value) lists, preferring b on equal keys."""
+        result = []
+        i = j = 0
+        while i < len(a) and j < len(b):
+            if b[j][0] < a[i][0]:
+                result.append(b[j])
+                j += 1
+            elif a[i][0] < b[j][0]:
+                result.append(a[i])
+                i += 1
+            else:                   # equal keys
+                result.append(b[j])
+                i += 1
+                j += 1
+        result.extend(a[i:])
+        result.extend(b[j:])
+        return result
+
+    def _build(self, items):
+        """Replace the contents of the map with a balanced tree of sorted (key, value) pairs.
+
+        Item i goes to slot i, so the pool is left without free slots.
+        """
+        n = len(items)
+        self._keys = [k for k, v in items]
+        self._values = [v for k, v in items]
+        self._left = array('i', [-1]) * n
+        self._right = array('i', [-1]) * n
+        self._parent = array('i', [-1]) * n
+        self._height = array('b', [0]) * n
+        self._free = -1
+        self._size = n
+        self._root = self._build_subtree(0, n, -1)
+
+    def _build_subtree(self, lo, hi, parent):
+        """Link slots lo to hi - 1 into a perfectly balanced subtree and return its root slot."""
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        self._parent[mid] = parent
+        left = self._left[mid] = self._build_subtree(lo, mid, mid)
+        right = self._right[mid] = self._build_subtree(mid + 1, hi, mid)
+        hl = self._height[left] if left != -1 else 0
+        hr = self._height[right] if right != -1 else 0
+        self._height[mid] = 1 + (hl if hl > hr else hr)
+        return mid
+
+    # -------------------- batch operations --------------------
+    def _finger_search(self, finger, k):
+        """Return (i, floor): slot having key k, or last slot searched, and a slot with key <= k.
+
+        The search climbs from finger, whose key must not exceed k, only until
+        k lies within the key range of the subtree, and descends from there.
+        With finger -1 the search starts at the root. floor is -1 only if no
+        key on the way is at most k.
+        """
+        keys, left, right, parent = self._keys, self._left, self._right, self._parent
+        i = finger
+        if i == -1:
+            i = self._root
+        else:
+            while parent[i] != -1:
+                above = parent[i]
+                if i == left[above] and k < keys[above]:
+                    break       # keys under i lie strictly between finger's bound and above's key
+                i = above
+        floor = finger
+        while True:
+            key = keys[i]
+            if k == key:
+                return i, i
+            if k < key:
+                child = left[i]
+            else:
+                floor = i
+                child = right[i]
+            if child == -1:
+                return i, floor
+            i = child
+
+    def get_many(self, keys, default=None):
+        """Return list of values for the given keys, in the given order (default for missing keys).
+
+        Keys are looked up in sorted order, each search starting from the previous one.
+        """
+        keys = list(keys)
+        result = [default] * len(keys)
+        finger = -1
+        for j in sorted(range(len(keys)), key=keys.__getitem__):
+            if self._root == -1:
+                break
+            k = keys[j]
+            i, finger = self._finger_search(finger, k)
+            if k == self._keys[i]:
+                result[j] = self._values[i]
+        return result
+
+    def set_many(self, items):
+        """Assign value v to key k for every (k, v) pair; the last pair wins for a repeated key.
+
+        Pairs are inserted in sorted order, each search starting from the
+        previous one. A batch at least a quarter the size of the map is merged
+        in with update_sorted instead, rebuilding the tree balanced in O(n + m)
+        time (which invalidates existing positions).
+        """
+        items = sorted(items, key=lambda item: item[0])     # stable, so later pairs stay later
+        if 4 * len(items) >= len(self):
+            unique = []
+            for k, v in items:
+                if unique and unique[-1][0] == k:
+                    unique[-1] = (k, v)
+                else:
+                    unique.append((k, v))
+            self.update_sorted(unique)
+            return
+        finger = -1
+        for k, v in items:
+            i, finger = self._finger_search(finger, k)
+            if k == self._keys[i]:
+                self._values[i] = v     # replace existing item value
+            else:
+                leaf = self._new_slot(k, v, i)
+                if self._keys[i] < k:
+                    self._right[i] = leaf
+                else:
+                    self._left[i] = leaf
+                self._rebalance(i)
+                finger = leaf
+
+    def delete_many(self, keys):
+        """Remove the items with the given keys and return how many were removed.
+
+        Keys not in the map are ignored. Keys are removed in sorted order, each
+        search starting from the previous deletion. A batch at least a quarter
+        the size of the map rebuilds the tree from the items kept in O(n + m)
+        time instead (which invalidates existing positions).
+        """
+        keys = sorted(keys)
+        if not keys or self._size == 0:
+            return 0
+        if 4 * len(keys) >= len(self):
+            kept = []
+            j = 0
+            for key, value in self.find_range(None, None):
+                while j < len(keys) and keys[j] < key:
+                    j += 1
+                if j == len(keys) or keys[j] != key:
+                    kept.append((key, value))
+            return self._rebuild_keeping(kept)
+        return self._delete_sorted(keys)
+
+    def delete_range(self, start, stop):
+        """Remove all items such that start <= key < stop and return how many were removed.
+
+        If start is None, removal begins with minimum key of map.
+        If stop is None, removal continues through the maximum key of map.
+        A span of at least a quarter of the map rebuilds the tree from the
+        items outside it in O(n) time (which invalidates existing positions);
+        smaller spans are deleted one by one, each starting from the previous.
+        """
+        doomed = [key for key, value in self.find_range(start, stop)]
+        if not doomed:
+            return 0
+        if 4 * len(doomed) >= len(self):
+            kept = []
+            if start is not None:
+                kept.extend(self.find_range(None, start))
+            if stop is not None:
+                kept.extend(self.find_range(stop, None))
+            return self._rebuild_keeping(kept)
+        return self._delete_sorted(doomed)
+
+    def _delete_sorted(self, keys):
+        """Delete items with the given sorted keys one by one and return how many were removed."""
+        removed = 0
+        finger = -1
+        for k in keys:
+            if self._root == -1:
+                break
+            i, floor = self._finger_search(finger, k)
+            if k != self._keys[i]:
+                finger = floor
+                continue
+            if self._left[i] != -1 and self._right[i] != -1:
+                finger = i      # survives, holding the item of its predecessor
+            else:
+                finger = self._before(i)
+            self._delete(i)
+            removed += 1
+        return removed
+
+    def _rebuild_keeping(self, kept):
+        """Rebuild the tree balanced from the sorted pairs kept and return how many items were dropped."""
+        removed = len(self) - len(kept)
+        if removed:
+            self._build(kept)
+        return removed
@@ -0,0 +1,150 @@
+import operator
+
+import OrderStatisticTreeMap
+
+
+class AugmentedTreeMap(OrderStatisticTreeMap.OrderStatisticTreeMap):
+    """Sorted map keeping an associative aggregate of every subtree, for O(log n) range queries.
+
+    The aggregate is a monoid given by combine and identity, applied in key
+    order to measure(key, value) of each item (the value itself by default).
+    Sum, min, max and count all fit; combine need not be commutative.
+
+    For interval overlap queries, map each interval's start to its end and
+    aggregate with max: find_range_where(None, hi, lambda end: end > lo)
+    then reports exactly the intervals meeting [lo, hi), skipping every
+    subtree whose intervals all end too early.
+    """
+
+    # -------------------- nested _Node class --------------------
+    class _Node(OrderStatisticTreeMap.OrderStatisticTreeMap._Node):
+        """Node class maintains the aggregate of the items in its subtree."""
+        __slots__ = '_agg'
+
+        def __init__(self, element, parent=None, left=None, right=None):
+            super().__init__(element, parent, left, right)
+            self._agg = None    # will be recomputed once the node is linked
+
+    def __init__(self, combine=operator.add, identity=0, measure=None):
+        """Create an empty map aggregating measure(key, value) with combine (sum of values by default)."""
+        super().__init__()
+        self._combine = combine
+        self._identity = identity
+        self._measure = measure if measure is not None else lambda k, v: v
+
+    # -------------------- maintain subtree aggregates --------------------
+    def _measure_node(self, node):
+        return self._measure(node._element._key, node._element._value)
+
+    def _agg_of(self, node):
+        return node._agg if node is not None else self._identity
+
+    def _recompute(self, node):
+        super()._recompute(node)
+        combine = self._combine
+        node._agg = combine(combine(self._agg_of(node._left), self._measure_node(node)),
+                            self._agg_of(node._right))
+
+    def _rebalance_replace(self, p):
+        # a value replaced in place changes the aggregates on the path to the root;
+        # stop as soon as one is unchanged. Lookups leave the tree untouched.
+        node = p.node
+        while node is not None:
+            old = node._agg
+            self._recompute(node)
+            if node._agg == old:
+                break
+            node = node._parent
+        super()._rebalance_replace(p)
+
+    # -------------------- bulk construction --------------------
+    @classmethod
+    def from_sorted(cls, items, combine=operator.add, identity=0, measure=None):
+        """Create a map from (key, value) pairs given in strictly increasing key order.
+
+        The tree is built perfectly balanced in O(n) time, without per-item searches.
+        """
+        t = cls(combine, identity, measure)
+        items = [t._Item(k, v) for k, v in items]
+        t._check_sorted(items)
+        t._build(items)
+        return t
+
+    def merge(self, other):
+        """Return a new map holding the items of this map and of other in O(n + m) time.
+
+        Where both maps hold a key, the value from other is used. The result
+        uses the aggregate of this map.
+        """
+        mine = [self._Item(node._element._key, node._element._value) for node in self._inorder_nodes()]
+        theirs = [self._Item(node._element._key, node._element._value) for node in other._inorder_nodes()]
+        result = type(self)(self._combine, self._identity, self._measure)
+        result._build(self._merge_items(mine, theirs))
+        return result
+
+    # -------------------- range aggregates --------------------
+    def aggregate(self):
+        """Return the aggregate of all items in the map (identity if empty)."""
+        return self._agg_of(self._root)
+
+    def aggregate_range(self, start, stop):
+        """Return the aggregate of items with start <= key < stop in O(log n) time.
+
+        If start is None, the range begins with minimum key of map.
+        If stop is None, the range continues through the maximum key of map.
+        """
+        combine = self._combine
+        node = self._root
+        while node is not None:     # find the highest node inside the range
+            if start is not None and node._element._key < start:
+                node = node._right
+            elif stop is not None and not node._element._key < stop:
+                node = node._left
+            else:
+                break
+        if node is None:
+            return self._identity
+        # below the split node, only the left boundary matters on the left and vice versa
+        low = self._identity
+        walk = node._left
+        while walk is not None:
+            if start is not None and walk._element._key < start:
+                walk = walk._right
+            else:       # walk and its right subtree are in range, after anything found below
+                low = combine(combine(self._measure_node(walk), self._agg_of(walk._right)), low)
+                walk = walk._left
+        high = self._identity
+        walk = node._right
+        while walk is not None:
+            if stop is not None and not walk._element._key < stop:
+                walk = walk._left
+            else:       # walk and its left subtree are in range, before anything found below
+                high = combine(high, combine(self._agg_of(walk._left), self._measure_node(walk)))
+                walk = walk._right
+        return combine(combine(low, self._measure_node(node)), high)
+
+    def find_range_where(self, start, stop, keep):
+        """Iterate (key, value) pairs with start <= key < stop whose measure satisfies keep.
+
+        Subtrees whose aggregate fails keep are skipped entirely, which is
+        correct when keep(combine(a, b)) implies keep(a) or keep(b), as for
+        a threshold test on a max or min aggregate.
+        """
+        stack = []
+
+        def descend(node):
+            while node is not None and keep(node._agg):
+                if start is not None and node._element._key < start:
+                    node = node._right      # node and its left subtree are out of range
+                else:
+                    stack.append(node)
+                    node = node._left
+
+        descend(self._root)
+        while stack:
+            node = stack.pop()
+            if stop is not None and not node._element._key < stop:
+                return
+            if keep(self._measure_node(node)):
+                yield node._element._key, node._element._value
+            descend(node._right)
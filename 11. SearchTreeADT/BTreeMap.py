@@ -0,0 +1,363 @@
+from bisect import bisect_left, bisect_right
+
+import MapBase
+
+
+class BTreeMap(MapBase.MapBase):
+    """Sorted map implementation using a B+ tree of sorted per-node lists.
+
+    Items live in leaves holding parallel key and value lists, linked to their
+    neighbours for range scans; internal nodes hold separator keys only. Every
+    node except the root holds between order//2 and order entries.
+    """
+
+    # -------------------- nested node classes --------------------
+    class _Leaf:
+        """Lightweight, nonpublic class for a leaf holding sorted keys and their values."""
+        __slots__ = ('_keys', '_values', '_prev', '_next')
+
+        def __init__(self, keys, values, prev=None, next=None):
+            self._keys = keys
+            self._values = values
+            self._prev = prev
+            self._next = next
+
+    class _Internal:
+        """Lightweight, nonpublic class for an internal node.
+
+        _keys[i] is the least key found under _children[i + 1].
+        """
+        __slots__ = ('_keys', '_children')
+
+        def __init__(self, keys, children):
+            self._keys = keys
+            self._children = children
+
+    # -------------------- nested Position class --------------------
+    class Position:
+        """A cursor representing the location of a single item."""
+
+        def __init__(self, container, leaf, index):
+            """Constructor should not be invoked by user."""
+            self._container = container
+            self._leaf = leaf
+            self._index = index
+            self._key = leaf._keys[index]
+
+        def key(self):
+            """Return key of map's key-value pair."""
+            return self._key
+
+        def value(self):
+            """Return value of map's key-value pair."""
+            leaf, i = self._container._locate(self)
+            return leaf._values[i]
+
+        def _is_current(self):
+            """Return True if the item is still stored at the recorded leaf slot."""
+            keys = self._leaf._keys
+            return self._index < len(keys) and keys[self._index] is self._key
+
+        def __eq__(self, other):
+            """Return True if other Position represents the same location."""
+            return type(other) is type(self) and other._container is self._container and other._key == self._key
+
+        def __ne__(self, other):
+            """Return True if other does not represents the same location."""
+            return not (self == other)
+
+    # -------------------- nonpublic utilities --------------------
+    def __init__(self, order=64):
+        """Create an empty map whose nodes hold at most order entries (at least 4)."""
+        if order < 4:
+            raise ValueError('order must be at least 4')
+        self._order = order
+        self._root = self._Leaf([], [])
+        self._height = 0        # number of internal levels above the leaves
+        self._size = 0
+
+    def _find_leaf(self, k, path=None):
+        """Return the leaf where key k belongs, recording (node, child index) pairs in path."""
+        node = self._root
+        for _ in range(self._height):
+            i = bisect_right(node._keys, k)
+            if path is not None:
+                path.append((node, i))
+            node = node._children[i]
+        return node
+
+    def _locate(self, p):
+        """Return (leaf, index) of Position p, raising ValueError if it is no longer valid."""
+        if not isinstance(p, self.Position):
+            raise TypeError('p must be proper Position type')
+        if p._container is not self:
+            raise ValueError('p does not belong to this container')
+        if p._is_current():
+            return p._leaf, p._index
+        leaf = self._find_leaf(p._key)      # item moved to another leaf by a split or merge
+        i = bisect_left(leaf._keys, p._key)
+        if i == len(leaf._keys) or leaf._keys[i] != p._key:
+            raise ValueError('p is no longer valid')
+        return leaf, i
+
+    def _make_position(self, leaf, index):
+        """Return Position for slot index of leaf, moving across leaf links (or None)."""
+        while index >= len(leaf._keys):
+            index -= len(leaf._keys)
+            leaf = leaf._next
+            if leaf is None:
+                return None
+        return self.Position(self, leaf, index)
+
+    def _first_leaf(self):
+        node = self._root
+        for _ in range(self._height):
+            node = node._children[0]
+        return node
+
+    def _last_leaf(self):
+        node = self._root
+        for _ in range(self._height):
+            node = node._children[-1]
+        return node
+
+    # -------------------- public accessors --------------------
+    def __len__(self):
+        """Return the number of items in the map."""
+        return self._size
+
+    def __getitem__(self, k):
+        """Return value associated with key k (raise KeyError if not found)."""
+        leaf = self._find_leaf(k)
+        i = bisect_left(leaf._keys, k)
+        if i == len(leaf._keys) or leaf._keys[i] != k:
+            raise KeyError('Key Error: ' + repr(k))
+        return leaf._values[i]
+
+    def __iter__(self):
+        """Generate an iteration of all keys in the map in order."""
+        leaf = self._first_leaf()
+        while leaf is not None:
+            yield from leaf._keys
+            leaf = leaf._next
+
+    def __reversed__(self):
+        """Generate an iteration of all keys in the map in reverse order."""
+        for item in self._find_range_reversed(None, None):
+            yield item[0]
+
+    def first(self):
+        """Return the first Position in the map (or None if empty)."""
+        return self._make_position(self._first_leaf(), 0)
+
+    def last(self):
+        """Return the last Position in the map (or None if empty)."""
+        leaf = self._last_leaf()
+        return self.Position(self, leaf, len(leaf._keys) - 1) if self._size > 0 else None
+
+    def before(self, p):
+        """Return the Position just before p in the natural order.
+
+        Return None if p is the first position.
+        """
+        leaf, i = self._locate(p)
+        if i > 0:
+            return self.Position(self, leaf, i - 1)
+        leaf = leaf._prev
+        return self.Position(self, leaf, len(leaf._keys) - 1) if leaf is not None else None
+
+    def after(self, p):
+        """Return the Position just after p in the natural order.
+
+        Return None if p is the last position.
+        """
+        leaf, i = self._locate(p)
+        return self._make_position(leaf, i + 1)
+
+    def find_position(self, k):
+        """Return position with key k, or else neighbour (or None if empty)."""
+        if self._size == 0:
+            return None
+        leaf = self._find_leaf(k)
+        i = min(bisect_left(leaf._keys, k), len(leaf._keys) - 1)
+        return self.Position(self, leaf, i)
+
+    def find_min(self):
+        """Return (key, value) pair with minimum key (or None if empty)."""
+        if self._size == 0:
+            return None
+        leaf = self._first_leaf()
+        return leaf._keys[0], leaf._values[0]
+
+    def find_ge(self, k):
+        """Return (key, value) pair with least key greater than or equal to k.
+
+        Return None if there does not exists such a key.
+        """
+        leaf = self._find_leaf(k)
+        i = bisect_left(leaf._keys, k)
+        if i == len(leaf._keys):
+            leaf = leaf._next   # least key of the next leaf is the answer
+            i = 0
+        return (leaf._keys[i], leaf._values[i]) if leaf is not None else None
+
+    def find_range(self, start, stop, reverse=False):
+        """Iterate all (key, value) pairs such that start <= key < stop.
+
+        If start is None, iteration begins with minimum key of map.
+        If stop is None, iteration continues through the maximum key of map.
+        If reverse is True, pairs are reported in decreasing key order.
+        """
+        if reverse:
+            yield from self._find_range_reversed(start, stop)
+            return
+        if start is None:
+            leaf, i = self._first_leaf(), 0
+        else:
+            leaf = self._find_leaf(start)
+            i = bisect_left(leaf._keys, start)
+        while leaf is not None:
+            keys = leaf._keys
+            if stop is not None and len(keys) > 0 and not keys[-1] < stop:
+                j = bisect_left(keys, stop, i)
+                yield from zip(keys[i:j], leaf._values[i:j])
+                return
+            yield from zip(keys[i:], leaf._values[i:])
+            leaf, i = leaf._next, 0
+
+    def _find_range_reversed(self, start, stop):
+        """Walk the leaves backwards from stop, following the _prev links."""
+        if stop is None:
+            leaf = self._last_leaf()
+            j = len(leaf._keys)
+        else:
+            leaf = self._find_leaf(stop)
+            j = bisect_left(leaf._keys, stop)
+        while leaf is not None:
+            keys = leaf._keys
+            if start is not None and len(keys) > 0 and keys[0] < start:
+                i = bisect_left(keys, start, 0, j)
+                yield from zip(reversed(keys[i:j]), reversed(leaf._values[i:j]))
+                return
+            yield from zip(reversed(keys[:j]), reversed(leaf._values[:j]))
+            leaf = leaf._prev
+            j = len(leaf._keys) if leaf is not None else 0
+
+    # -------------------- public update methods --------------------
+    def __setitem__(self, k, v):
+        """Assign value v to key k, overwriting existing value if present."""
+        path = []
+        leaf = self._find_leaf(k, path)
+        i = bisect_left(leaf._keys, k)
+        if i < len(leaf._keys) and leaf._keys[i] == k:
+            leaf._values[i] = v     # replace existing item value
+            return
+        leaf._keys.insert(i, k)
+        leaf._values.insert(i, v)
+        self._size += 1
+        if len(leaf._keys) > self._order:
+            self._split(leaf, path)
+
+    def __delitem__(self, k):
+        """Remove item associated with key k (raise KeyError if not found)."""
+        path = []
+        leaf = self._find_leaf(k, path)
+        i = bisect_left(leaf._keys, k)
+        if i == len(leaf._keys) or leaf._keys[i] != k:
+            raise KeyError('Key Error: ' + repr(k))
+        del leaf._keys[i]
+        del leaf._values[i]
+        self._size -= 1
+        self._fix_underflow(leaf, path)
+
+    def delete(self, p):
+        """Remove the item at given Position."""
+        leaf, i = self._locate(p)
+        del self[leaf._keys[i]]
+
+    # -------------------- rebalancing --------------------
+    def _split(self, node, path):
+        """Split overfull node, propagating separator keys up the recorded path."""
+        while True:
+            mid = len(node._keys) // 2
+            if isinstance(node, self._Leaf):
+                sibling = self._Leaf(node._keys[mid:], node._values[mid:], node, node._next)
+                del node._keys[mid:]
+                del node._values[mid:]
+                if node._next is not None:
+                    node._next._prev = sibling
+                node._next = sibling
+                separator = sibling._keys[0]
+            else:
+                separator = node._keys[mid]     # moves up into the parent
+                sibling = self._Internal(node._keys[mid + 1:], node._children[mid + 1:])
+                del node._keys[mid:]
+                del node._children[mid + 1:]
+            if not path:                        # node was the root
+                self._root = self._Internal([separator], [node, sibling])
+                self._height += 1
+                return
+            parent, i = path.pop()
+            parent._keys.insert(i, separator)
+            parent._children.insert(i + 1, sibling)
+            if len(parent._children) <= self._order:
+                return
+            node = parent
+
+    def _fix_underflow(self, node, path):
+        """Restore minimum occupancy of node by borrowing from or merging with a sibling."""
+        minimum = self._order // 2
+        while path:
+            leaf = isinstance(node, self._Leaf)
+            if len(node._keys) + (0 if leaf else 1) >= minimum:
+                return
+            parent, i = path.pop()
+            left = parent._children[i - 1] if i > 0 else None
+            right = parent._children[i + 1] if i + 1 < len(parent._children) else None
+            if left is not None and len(left._keys) + (0 if leaf else 1) > minimum:
+                # transfer last entry of left sibling
+                if leaf:
+                    node._keys.insert(0, left._keys.pop())
+                    node._values.insert(0, left._values.pop())
+                    parent._keys[i - 1] = node._keys[0]
+                else:
+                    node._keys.insert(0, parent._keys[i - 1])
+                    node._children.insert(0, left._children.pop())
+                    parent._keys[i - 1] = left._keys.pop()
+                return
+            if right is not None and len(right._keys) + (0 if leaf else 1) > minimum:
+                # transfer first entry of right sibling
+                if leaf:
+                    node._keys.append(right._keys.pop(0))
+                    node._values.append(right._values.pop(0))
+                    parent._keys[i] = right._keys[0]
+                else:
+                    node._keys.append(parent._keys[i])
+                    node._children.append(right._children.pop(0))
+                    parent._keys[i] = right._keys.pop(0)
+                return
+            if left is not None:                # fuse node into left sibling
+                self._merge(parent, i - 1)
+            else:                               # fuse right sibling into node
+                self._merge(parent, i)
+            node = parent
+        if not isinstance(node, self._Leaf) and len(node._children) == 1:
+            self._root = node._children[0]      # root lost its last separator
+            self._height -= 1
+
+    def _merge(self, parent, i):
+        """Merge child i + 1 of parent into child i and drop their separator."""
+        a = parent._children[i]
+        b = parent._children.pop(i + 1)
+        separator = parent._keys.pop(i)
+        if isinstance(a, self._Leaf):
+            a._keys.extend(b._keys)
+            a._values.extend(b._values)
+            a._next = b._next
+            if b._next is not None:
+                b._next._prev = a
+            b._keys, b._values = [], []     # so positions at b are detected as moved
+        else:
+            a._keys.append(separator)
+            a._keys.extend(b._keys)
+            a._children.extend(b._children)
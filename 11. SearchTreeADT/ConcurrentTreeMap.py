@@ -0,0 +1,305 @@
+import collections.abc
+import threading
+
+import MapBase
+import PersistentTreeMap
+
+
+class ConcurrentTreeMap(MapBase.MapBase):
+    """Thread-safe sorted map wrapping another sorted map.
+
+    Updates are serialized by a lock. Over a map that declares _atomic_reads
+    (the default PersistentTreeMap), lookups take no lock at all: they read
+    the version current when they start, which updates replace in a single
+    assignment. Over any other map, lookups share a reader-writer lock, or
+    hold it exclusively when the map declares _reads_mutate (such as a
+    SplayTreeMap or DiskBTreeMap).
+    No lock is held while an iterator yields, so a loop may update the map.
+    """
+
+    # -------------------- nested _ReadWriteLock class --------------------
+    class _ReadWriteLock:
+        """Lock allowing many readers or one writer; waiting writers block new readers."""
+        __slots__ = '_mutex', '_cond', '_readers', '_writer', '_waiting_writers'
+
+        def __init__(self):
+            self._mutex = threading.Lock()     # entered directly on the uncontended read path
+            self._cond = threading.Condition(self._mutex)
+            self._readers = 0
+            self._writer = False
+            self._waiting_writers = 0
+
+        def acquire_read(self):
+            with self._mutex:
+                while self._writer or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+
+        def release_read(self):
+            with self._mutex:
+                self._readers -= 1
+                if self._readers == 0 and self._waiting_writers:
+                    self._cond.notify_all()
+
+        def acquire_write(self):
+            with self._cond:
+                self._waiting_writers += 1
+                while self._writer or self._readers:
+                    self._cond.wait()
+                self._waiting_writers -= 1
+                self._writer = True
+
+        def release_write(self):
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+    # -------------------- nested view classes --------------------
+    class _ItemsView(collections.abc.ItemsView):
+        def __iter__(self):
+            return self._mapping.find_range(None, None)
+
+    class _ValuesView(collections.abc.ValuesView):
+        def __iter__(self):
+            for item in self._mapping.find_range(None, None):
+                yield item[1]
+
+    # -------------------- nonpublic utilities --------------------
+    _marker = object()      # distinguishes a missing default from None
+
+    def __init__(self, base=None, chunk=256, exclusive_reads=None):
+        """Create a map wrapping sorted map base (a new PersistentTreeMap by default).
+
+        If exclusive_reads is None, it is taken from the _reads_mutate
+        declaration of the base map; pass True for a map whose lookups change
+        its state without declaring so.
+        Iteration copies up to chunk items at a time under the read lock.
+        The base map must not be used directly once wrapped.
+        """
+        self._map = base if base is not None else PersistentTreeMap.PersistentTreeMap()
+        self._lock = self._ReadWriteLock()
+        self._chunk = chunk
+        if exclusive_reads is None:
+            exclusive_reads = self._map._reads_mutate
+        self._exclusive_reads = exclusive_reads
+        self._lock_free = self._map._atomic_reads and not exclusive_reads
+
+    def _acquire_read(self):
+        if self._exclusive_reads:
+            self._lock.acquire_write()
+        else:
+            self._lock.acquire_read()
+
+    def _release_read(self):
+        if self._exclusive_reads:
+            self._lock.release_write()
+        else:
+            self._lock.release_read()
+
+    # -------------------- public accessors --------------------
+    def __len__(self):
+        """Return the number of items in the map."""
+        return len(self._map)
+
+    def __getitem__(self, k):
+        """Return value associated with key k (raise KeyError if not found)."""
+        if self._lock_free:
+            return self._map[k]
+        self._acquire_read()
+        try:
+            return self._map[k]
+        finally:
+            self._release_read()
+
+    def __contains__(self, k):
+        """Return True if the map has an item with key k."""
+        if self._lock_free:
+            return k in self._map
+        self._acquire_read()
+        try:
+            return k in self._map
+        finally:
+            self._release_read()
+
+    def find_min(self):
+        """Return (key, value) pair with minimum key (or None if empty)."""
+        if self._lock_free:
+            return self._map.find_min()
+        self._acquire_read()
+        try:
+            return self._map.find_min()
+        finally:
+            self._release_read()
+
+    def find_ge(self, k):
+        """Return (key, value) pair with least key greater than or equal to k.
+
+        Return None if there does not exists such a key.
+        """
+        if self._lock_free:
+            return self._map.find_ge(k)
+        self._acquire_read()
+        try:
+            return self._map.find_ge(k)
+        finally:
+            self._release_read()
+
+    def find_range(self, start, stop, reverse=False):
+        """Iterate all (key, value) pairs such that start <= key < stop.
+
+        If start is None, iteration begins with minimum key of map.
+        If stop is None, iteration continues through the maximum key of map.
+        If reverse is True, pairs are reported in decreasing key order.
+        Without a lock-free base, pairs are copied out in chunks under the read
+        lock, and each chunk resumes after the last key reported, so concurrent
+        updates never break the iteration: every key is reported at most once,
+        in order, and keys present throughout the iteration are always reported.
+        A lock-free base reports the version current when iteration starts.
+        """
+        if self._lock_free:
+            yield from self._map.find_range(start, stop, reverse)
+            return
+        resume = start if not reverse else stop
+        skip = False            # whether the first pair found may repeat the last one reported
+        while True:
+            self._acquire_read()
+            try:
+                if not reverse:
+                    pairs = self._map.find_range(resume, stop)
+                else:
+                    pairs = self._map.find_range(start, resume, reverse=True)
+                chunk = []
+                for key, value in pairs:
+                    if skip and not chunk and not resume < key:
+                        continue            # resume key of the previous chunk
+                    chunk.append((key, value))
+                    if len(chunk) == self._chunk:
+                        break
+            finally:
+                self._release_read()
+            yield from chunk
+            if len(chunk) < self._chunk:
+                return
+            resume = chunk[-1][0]
+            skip = not reverse      # a reverse resume key is already an exclusive bound
+
+    def __iter__(self):
+        """Generate an iteration of all keys in the map in order."""
+        for item in self.find_range(None, None):
+            yield item[0]
+
+    def __reversed__(self):
+        """Generate an iteration of all keys in the map in reverse order."""
+        for item in self.find_range(None, None, reverse=True):
+            yield item[0]
+
+    def items(self):
+        """Return a view of (key, value) pairs, iterated safely under concurrent updates."""
+        return self._ItemsView(self)
+
+    def values(self):
+        """Return a view of values, iterated safely under concurrent updates."""
+        return self._ValuesView(self)
+
+    # -------------------- public update methods --------------------
+    def __setitem__(self, k, v):
+        """Assign value v to key k, overwriting existing value if present."""
+        self._lock.acquire_write()
+        try:
+            self._map[k] = v
+        finally:
+            self._lock.release_write()
+
+    def __delitem__(self, k):
+        """Remove item associated with key k (raise KeyError if not found)."""
+        self._lock.acquire_write()
+        try:
+            del self._map[k]
+        finally:
+            self._lock.release_write()
+
+    def setdefault(self, k, default=None):
+        """Atomically return value for key k, first inserting default if k is absent."""
+        self._lock.acquire_write()
+        try:
+            try:
+                return self._map[k]
+            except KeyError:
+                self._map[k] = default
+                return default
+        finally:
+            self._lock.release_write()
+
+    def pop(self, k, default=_marker):
+        """Atomically remove key k and return its value.
+
+        If k is absent, return default if given, else raise KeyError.
+        """
+        self._lock.acquire_write()
+        try:
+            try:
+                value = self._map[k]
+            except KeyError:
+                if default is self._marker:
+                    raise
+                return default
+            del self._map[k]
+            return value
+        finally:
+            self._lock.release_write()
+
+    def popitem(self):
+        """Atomically remove and return the (key, value) pair with minimum key.
+
+        Raise KeyError if the map is empty.
+        """
+        self._lock.acquire_write()
+        try:
+            item = self._map.find_min()
+            if item is None:
+                raise KeyError('popitem(): map is empty')
+            del self._map[item[0]]
+            return item
+        finally:
+            self._lock.release_write()
+
+    def update(self, other=(), **kwds):
+        """Atomically assign every pair from other and kwds, as dict.update does."""
+        if isinstance(other, collections.abc.Mapping) or hasattr(other, 'keys'):
+            pairs = [(k, other[k]) for k in other.keys()]
+        else:
+            pairs = list(other)
+        pairs.extend(kwds.items())      # gathered first, as other may be this very map
+        self._lock.acquire_write()
+        try:
+            for k, v in pairs:
+                self._map[k] = v
+        finally:
+            self._lock.release_write()
+
+    def compare_and_set(self, k, expected, v):
+        """Atomically assign v to key k if its current value equals expected.
+
+        Return True if the value was replaced, False otherwise (including when
+        k is absent).
+        """
+        self._lock.acquire_write()
+        try:
+            try:
+                current = self._map[k]
+            except KeyError:
+                return False
+            if current != expected:
+                return False
+            self._map[k] = v
+            return True
+        finally:
+            self._lock.release_write()
+
+    def clear(self):
+        """Atomically remove all items from the map."""
+        self._lock.acquire_write()
+        try:
+            self._map.clear()
+        finally:
+            self._lock.release_write()
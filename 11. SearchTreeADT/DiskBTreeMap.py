@@ -0,0 +1,452 @@
+import mmap
+import os
+import pickle
+import struct
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+import MapBase
+
+
+class DiskBTreeMap(MapBase.MapBase):
+    """Sorted map stored as a B+ tree in fixed-size pages of a file, read through mmap.
+
+    Opening a file only maps it; pages are decoded on first use and kept in an
+    LRU cache of cache_size pages. Updates stay in the cache until flush() or
+    close() writes all dirty pages back in one pass (or a dirty page is evicted).
+    The file is only consistent after flush(): the header is marked open before
+    the first page is written and cleared once flush() completes, and a file
+    still marked open (say, after a crash) is refused.
+    Leaves are linked in both directions for range scans. Keys and values must
+    be picklable, and a single item must fit in a quarter of a page.
+    """
+
+    _MAGIC = b'PyADTbpt'
+    _VERSION = 2
+    # magic, version, page size, root page, height, item count, page count, free list head, open flag
+    _HEADER = struct.Struct('<8sIIQQQQQI')
+    # page kind, payload length, used bytes (or next free page for a free page)
+    _PAGE = struct.Struct('<BIQ')
+    _FREE, _LEAF, _INTERNAL = 0, 1, 2
+    _SLACK = 64     # bytes reserved in each page for pickle framing
+    _cache = None   # lets close() skip flushing when opening the file failed
+    _reads_mutate = True    # lookups load and reorder pages in the LRU cache
+
+    # -------------------- nested node classes --------------------
+    class _Leaf:
+        """Lightweight, nonpublic class for a decoded leaf page (page 0 means no neighbour)."""
+        __slots__ = ('_keys', '_values', '_prev', '_next', '_used')
+
+        def __init__(self, keys, values, prev, next, used):
+            self._keys = keys
+            self._values = values
+            self._prev = prev
+            self._next = next
+            self._used = used   # estimated encoded size of the entries
+
+    class _Internal:
+        """Lightweight, nonpublic class for a decoded internal page.
+
+        _keys[i] is the least key found under page _children[i + 1].
+        """
+        __slots__ = ('_keys', '_children', '_used')
+
+        def __init__(self, keys, children, used):
+            self._keys = keys
+            self._children = children
+            self._used = used
+
+    # -------------------- nonpublic utilities --------------------
+    def __init__(self, path, page_size=4096, cache_size=256):
+        """Open the map stored at path, creating an empty one if the file is missing or empty.
+
+        page_size only applies to a new file; an existing file keeps its own.
+        """
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, 'r+b')
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+            try:
+                (magic, version, self._page_size, self._root, self._height, self._size,
+                 self._page_count, self._free, is_open) = self._HEADER.unpack_from(self._mm, 0)
+            except struct.error:    # shorter than the header
+                magic = None
+            if magic != self._MAGIC or version != self._VERSION:
+                self.close()
+                raise ValueError('not a DiskBTreeMap file: ' + repr(path))
+            if is_open:
+                self.close()
+                raise ValueError('DiskBTreeMap file was not flushed after its last update: ' + repr(path))
+        else:
+            if page_size < 512:
+                raise ValueError('page_size must be at least 512')
+            self._file = open(path, 'w+b')
+            self._file.truncate(16 * page_size)
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+            self._page_size = page_size
+            self._root, self._height, self._size = 0, 0, 0
+            self._page_count = 1        # page 0 holds the header
+            self._free = 0
+        self._cache = OrderedDict()     # page number -> decoded node, least recently used first
+        self._dirty = set()
+        self._marked_open = False       # whether the header on file carries the open flag
+        self._cache_size = max(cache_size, 8)
+        self._fill = self._page_size - self._PAGE.size - self._SLACK
+        if self._root == 0:
+            self._root = self._allocate(self._Leaf([], [], 0, 0, 0))
+            self.flush()
+
+    def _page(self, pid):
+        """Return the decoded node stored in page pid."""
+        node = self._cache.get(pid)
+        if node is not None:
+            self._cache.move_to_end(pid)
+            return node
+        offset = pid * self._page_size
+        kind, length, used = self._PAGE.unpack_from(self._mm, offset)
+        start = offset + self._PAGE.size
+        fields = pickle.loads(self._mm[start:start + length])
+        if kind == self._LEAF:
+            node = self._Leaf(*fields, used)
+        else:
+            node = self._Internal(*fields, used)
+        self._cache[pid] = node
+        return node
+
+    def _write_header(self, is_open):
+        self._HEADER.pack_into(self._mm, 0, self._MAGIC, self._VERSION, self._page_size, self._root,
+                               self._height, self._size, self._page_count, self._free, is_open)
+        self._mm.flush(0, self._page_size)
+        self._marked_open = is_open
+
+    def _mark_open(self):
+        """Flag the file as inconsistent before a page is first changed in place."""
+        if not self._marked_open:
+            self._write_header(1)
+
+    def _write_page(self, pid, node):
+        self._mark_open()
+        if isinstance(node, self._Leaf):
+            kind, fields = self._LEAF, (node._keys, node._values, node._prev, node._next)
+        else:
+            kind, fields = self._INTERNAL, (node._keys, node._children)
+        payload = pickle.dumps(fields, pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self._page_size - self._PAGE.size:
+            raise ValueError('page overflow; use a larger page_size')
+        offset = pid * self._page_size
+        self._PAGE.pack_into(self._mm, offset, kind, len(payload), node._used)
+        start = offset + self._PAGE.size
+        self._mm[start:start + len(payload)] = payload
+
+    def _trim(self):
+        """Evict least recently used pages beyond the cache size, writing back dirty ones."""
+        while len(self._cache) > self._cache_size:
+            pid, node = self._cache.popitem(last=False)
+            if pid in self._dirty:
+                self._dirty.remove(pid)
+                self._write_page(pid, node)
+
+    def _allocate(self, node):
+        """Store node in a free or new page and return the page number."""
+        if self._free:
+            pid = self._free
+            self._free = self._PAGE.unpack_from(self._mm, pid * self._page_size)[2]
+        else:
+            pid = self._page_count
+            self._page_count += 1
+            if self._page_count * self._page_size > len(self._mm):
+                self._remap(2 * len(self._mm))
+        self._cache[pid] = node
+        self._dirty.add(pid)
+        return pid
+
+    def _release(self, pid):
+        """Return page pid to the free list."""
+        self._cache.pop(pid, None)
+        self._dirty.discard(pid)
+        self._mark_open()
+        self._PAGE.pack_into(self._mm, pid * self._page_size, self._FREE, 0, self._free)
+        self._free = pid
+
+    def _remap(self, length):
+        self._mm.close()
+        self._file.truncate(length)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def _entry_size(self, k, v):
+        """Upper bound on the encoded size of leaf entry (k, v)."""
+        return len(pickle.dumps(k, pickle.HIGHEST_PROTOCOL)) + len(pickle.dumps(v, pickle.HIGHEST_PROTOCOL))
+
+    def _separator_size(self, k):
+        """Upper bound on the encoded size of separator k and its child page number."""
+        return len(pickle.dumps(k, pickle.HIGHEST_PROTOCOL)) + 9
+
+    def _find_leaf(self, k, path=None):
+        """Return (page, leaf) where key k belongs, recording (page, child index) pairs in path."""
+        pid = self._root
+        for _ in range(self._height):
+            node = self._page(pid)
+            i = bisect_right(node._keys, k)
+            if path is not None:
+                path.append((pid, i))
+            pid = node._children[i]
+        return pid, self._page(pid)
+
+    def _edge_leaf(self, last):
+        pid = self._root
+        for _ in range(self._height):
+            pid = self._page(pid)._children[-1 if last else 0]
+        return pid, self._page(pid)
+
+    # -------------------- public accessors --------------------
+    def __len__(self):
+        """Return the number of items in the map."""
+        return self._size
+
+    def __getitem__(self, k):
+        """Return value associated with key k (raise KeyError if not found)."""
+        leaf = self._find_leaf(k)[1]
+        i = bisect_left(leaf._keys, k)
+        found = i < len(leaf._keys) and leaf._keys[i] == k
+        value = leaf._values[i] if found else None
+        self._trim()
+        if not found:
+            raise KeyError('Key Error: ' + repr(k))
+        return value
+
+    def __iter__(self):
+        """Generate an iteration of all keys in the map in order."""
+        for item in self.find_range(None, None):
+            yield item[0]
+
+    def __reversed__(self):
+        """Generate an iteration of all keys in the map in reverse order."""
+        for item in self.find_range(None, None, reverse=True):
+            yield item[0]
+
+    def find_min(self):
+        """Return (key, value) pair with minimum key (or None if empty)."""
+        for item in self.find_range(None, None):
+            return item
+        return None
+
+    def find_ge(self, k):
+        """Return (key, value) pair with least key greater than or equal to k.
+
+        Return None if there does not exists such a key.
+        """
+        leaf = self._find_leaf(k)[1]
+        i = bisect_left(leaf._keys, k)
+        while i == len(leaf._keys):     # least key of a following leaf is the answer
+            if not leaf._next:
+                self._trim()
+                return None
+            leaf, i = self._page(leaf._next), 0
+        self._trim()
+        return leaf._keys[i], leaf._values[i]
+
+    def find_range(self, start, stop, reverse=False):
+        """Iterate all (key, value) pairs such that start <= key < stop.
+
+        If start is None, iteration begins with minimum key of map.
+        If stop is None, iteration continues through the maximum key of map.
+        If reverse is True, pairs are reported in decreasing key order.
+        Pairs are read one leaf at a time along the leaf links.
+        """
+        if not reverse:
+            if start is None:
+                leaf = self._edge_leaf(False)[1]
+                i = 0
+            else:
+                leaf = self._find_leaf(start)[1]
+                i = bisect_left(leaf._keys, start)
+            while True:
+                keys, following = leaf._keys, leaf._next
+                done = stop is not None and keys and not keys[-1] < stop
+                j = bisect_left(keys, stop, i) if done else len(keys)
+                chunk = list(zip(keys[i:j], leaf._values[i:j]))
+                self._trim()
+                yield from chunk
+                if done or not following:
+                    return
+                leaf, i = self._page(following), 0
+        else:
+            if stop is None:
+                leaf = self._edge_leaf(True)[1]
+                j = len(leaf._keys)
+            else:
+                leaf = self._find_leaf(stop)[1]
+                j = bisect_left(leaf._keys, stop)
+            while True:
+                keys, preceding = leaf._keys, leaf._prev
+                done = start is not None and keys and keys[0] < start
+                i = bisect_left(keys, start, 0, j) if done else 0
+                chunk = list(zip(keys[i:j], leaf._values[i:j]))
+                chunk.reverse()
+                self._trim()
+                yield from chunk
+                if done or not preceding:
+                    return
+                leaf = self._page(preceding)
+                j = len(leaf._keys)
+
+    # -------------------- public update methods --------------------
+    def __setitem__(self, k, v):
+        """Assign value v to key k, overwriting existing value if present."""
+        size = self._entry_size(k, v)
+        if size > self._fill // 4:
+            raise ValueError('item too large for page size')
+        path = []
+        pid, leaf = self._find_leaf(k, path)
+        i = bisect_left(leaf._keys, k)
+        if i < len(leaf._keys) and leaf._keys[i] == k:
+            leaf._used += size - self._entry_size(leaf._keys[i], leaf._values[i])
+            leaf._values[i] = v     # replace existing item value
+        else:
+            leaf._keys.insert(i, k)
+            leaf._values.insert(i, v)
+            leaf._used += size
+            self._size += 1
+        self._dirty.add(pid)
+        if leaf._used > self._fill:
+            self._split(pid, leaf, path)
+        self._trim()
+
+    def __delitem__(self, k):
+        """Remove item associated with key k (raise KeyError if not found)."""
+        path = []
+        pid, leaf = self._find_leaf(k, path)
+        i = bisect_left(leaf._keys, k)
+        if i == len(leaf._keys) or leaf._keys[i] != k:
+            self._trim()
+            raise KeyError('Key Error: ' + repr(k))
+        leaf._used -= self._entry_size(leaf._keys[i], leaf._values[i])
+        del leaf._keys[i]
+        del leaf._values[i]
+        self._size -= 1
+        self._dirty.add(pid)
+        self._fix_underflow(leaf, path)
+        self._trim()
+
+    def flush(self):
+        """Write all dirty pages and the header back to the file, leaving it consistent."""
+        for pid in sorted(self._dirty):     # one sequential pass over the file
+            self._write_page(pid, self._cache[pid])
+        self._dirty.clear()
+        self._mm.flush()                    # pages reach the disk before the header that refers to them
+        self._write_header(0)
+
+    def close(self):
+        """Flush pending updates and release the file."""
+        if self._mm.closed:
+            return
+        if self._cache is not None:
+            self.flush()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # -------------------- rebalancing --------------------
+    def _split(self, pid, node, path):
+        """Split overfull node at its byte midpoint, propagating separators up the recorded path."""
+        while True:
+            if isinstance(node, self._Leaf):
+                sizes = [self._entry_size(k, v) for k, v in zip(node._keys, node._values)]
+            else:
+                sizes = [self._separator_size(k) for k in node._keys]
+            total, mid = 0, 0
+            while total < node._used // 2 and mid < len(sizes) - 1:
+                total += sizes[mid]
+                mid += 1
+            mid = max(mid, 1)
+            if isinstance(node, self._Leaf):
+                sibling = self._Leaf(node._keys[mid:], node._values[mid:], pid, node._next,
+                                     sum(sizes[mid:]))
+                sid = self._allocate(sibling)
+                if node._next:
+                    self._page(node._next)._prev = sid
+                    self._dirty.add(node._next)
+                node._next = sid
+                del node._keys[mid:]
+                del node._values[mid:]
+                node._used = sum(sizes[:mid])
+                separator = sibling._keys[0]
+            else:
+                separator = node._keys[mid]     # moves up into the parent
+                sibling = self._Internal(node._keys[mid + 1:], node._children[mid + 1:],
+                                         sum(sizes[mid + 1:]))
+                sid = self._allocate(sibling)
+                del node._keys[mid:]
+                del node._children[mid + 1:]
+                node._used = sum(sizes[:mid])
+            self._dirty.add(pid)
+            if not path:                        # node was the root
+                self._root = self._allocate(self._Internal([separator], [pid, sid],
+                                                           self._separator_size(separator)))
+                self._height += 1
+                return
+            pid, i = path.pop()
+            node = self._page(pid)
+            node._keys.insert(i, separator)
+            node._children.insert(i + 1, sid)
+            node._used += self._separator_size(separator)
+            self._dirty.add(pid)
+            if node._used <= self._fill:
+                return
+
+    def _fix_underflow(self, node, path):
+        """Merge a sparse node into a sibling when both fit in one page.
+
+        Nodes too large to merge are left underfull rather than borrowing entries.
+        """
+        while path and node._used < self._fill // 4:
+            ppid, i = path.pop()
+            parent = self._page(ppid)
+            if i > 0:
+                j = i - 1                       # fuse node into its left sibling
+            elif i + 1 < len(parent._children):
+                j = i                           # fuse right sibling into node
+            else:
+                break
+            a = self._page(parent._children[j])
+            b = self._page(parent._children[j + 1])
+            separator = parent._keys[j]
+            extra = 0 if isinstance(a, self._Leaf) else self._separator_size(separator)
+            if a._used + b._used + extra > self._fill:
+                break
+            self._merge(ppid, parent, j, a, b)
+            node = parent
+        while self._height > 0:
+            root = self._page(self._root)
+            if len(root._children) > 1:
+                break
+            old = self._root
+            self._root = root._children[0]      # root lost its last separator
+            self._height -= 1
+            self._release(old)
+
+    def _merge(self, ppid, parent, j, a, b):
+        """Merge child j + 1 of parent into child j and drop their separator."""
+        bid = parent._children.pop(j + 1)
+        separator = parent._keys.pop(j)
+        parent._used -= self._separator_size(separator)
+        if isinstance(a, self._Leaf):
+            a._keys.extend(b._keys)
+            a._values.extend(b._values)
+            a._next = b._next
+            if b._next:
+                self._page(b._next)._prev = parent._children[j]
+                self._dirty.add(b._next)
+        else:
+            a._keys.append(separator)
+            a._keys.extend(b._keys)
+            a._children.extend(b._children)
+            a._used += self._separator_size(separator)
+        a._used += b._used
+        self._dirty.add(parent._children[j])
+        self._dirty.add(ppid)
+        self._release(bid)
@@ -0,0 +1,101 @@
+import AVLTreeMap
+
+
+class OrderStatisticTreeMap(AVLTreeMap.AVLTreeMap):
+    """Sorted map with rank and selection queries, using an AVL tree with subtree sizes."""
+
+    # -------------------- nested _Node class --------------------
+    class _Node(AVLTreeMap.AVLTreeMap._Node):
+        """Node class maintains number of items in the subtree rooted at the node."""
+        __slots__ = '_size'
+
+        def __init__(self, element, parent=None, left=None, right=None):
+            super().__init__(element, parent, left, right)
+            self._size = 1
+
+    # -------------------- maintain subtree sizes --------------------
+    def _recompute(self, node):
+        """Recompute the augmented fields of node from its children."""
+        left = node._left._size if node._left is not None else 0
+        right = node._right._size if node._right is not None else 0
+        node._size = 1 + left + right
+
+    def _recompute_upward(self, node):
+        """Recompute augmented fields of node and all of its ancestors."""
+        while node is not None:
+            self._recompute(node)
+            node = node._parent
+
+    def _add_root(self, e):
+        root = super()._add_root(e)
+        self._recompute(root.node)
+        return root
+
+    def _add_left(self, p, e):
+        leaf = super()._add_left(p, e)
+        self._recompute_upward(leaf.node)
+        return leaf
+
+    def _add_right(self, p, e):
+        leaf = super()._add_right(p, e)
+        self._recompute_upward(leaf.node)
+        return leaf
+
+    def _delete(self, p):
+        parent = p.node._parent
+        element = super()._delete(p)
+        self._recompute_upward(parent)
+        return element
+
+    def _rotate(self, p):
+        y = p.node._parent      # former parent becomes child of p
+        super()._rotate(p)
+        self._recompute(y)
+        self._recompute(p.node)
+
+    def _rebalance_build(self, node, depth, max_depth):
+        super()._rebalance_build(node, depth, max_depth)
+        self._recompute(node)
+
+    # -------------------- order statistics --------------------
+    def rank(self, k):
+        """Return the number of keys strictly less than k."""
+        r = 0
+        node = self._root
+        while node is not None:
+            if node._element._key < k:
+                r += 1 + (node._left._size if node._left is not None else 0)
+                node = node._right
+            else:
+                node = node._left
+        return r
+
+    def select(self, i):
+        """Return (key, value) pair with the i-th smallest key, counting from 0.
+
+        Raise IndexError if i is out of range.
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('Index Error: ' + repr(i))
+        node = self._root
+        while True:
+            left = node._left._size if node._left is not None else 0
+            if i < left:
+                node = node._left
+            elif i == left:
+                return node._element._key, node._element._value
+            else:
+                i -= left + 1
+                node = node._right
+
+    def count_range(self, start, stop):
+        """Return the number of keys k such that start <= k < stop.
+
+        If start is None, counting begins with minimum key of map.
+        If stop is None, counting continues through the maximum key of map.
+        """
+        high = len(self) if stop is None else self.rank(stop)
+        low = 0 if start is None else self.rank(start)
+        return max(0, high - low)
@@ -0,0 +1,239 @@
+import MapBase
+
+
+class PersistentTreeMap(MapBase.MapBase):
+    """Sorted map implementation using a persistent AVL tree.
+
+    Nodes are never modified once built. An update copies only the O(log n)
+    nodes on the path to the changed key and shares every other subtree with
+    the previous version, so snapshot() is O(1) and an old version costs
+    memory only for the paths changed since it was taken.
+    """
+
+    _atomic_reads = True    # readers see self._version, which updates replace in one assignment
+
+    # -------------------- nested _Node class --------------------
+    class _Node:
+        """Lightweight, nonpublic class for storing an immutable tree node.
+
+        We use convention that a "None" child has height 0, thus a leaf has height 1.
+        """
+        __slots__ = '_key', '_value', '_left', '_right', '_height'
+
+        def __init__(self, key, value, left=None, right=None):
+            self._key = key
+            self._value = value
+            self._left = left
+            self._right = right
+            self._height = 1 + max(left._height if left is not None else 0,
+                                   right._height if right is not None else 0)
+
+    # -------------------- nonpublic utilities --------------------
+    def __init__(self):
+        """Create an empty map."""
+        self._version = (None, 0)     # (root, size), published in a single assignment
+        self._frozen = False
+
+    def _check_mutable(self):
+        if self._frozen:
+            raise TypeError('snapshot is read-only')
+
+    def _balance(self, key, value, left, right):
+        """Return a new node for key with given subtrees, rotating if they differ in height by 2."""
+        node = self._Node
+        hl = left._height if left is not None else 0
+        hr = right._height if right is not None else 0
+        if hl > hr + 1:
+            ll = left._left._height if left._left is not None else 0
+            lr = left._right._height if left._right is not None else 0
+            if ll >= lr:                # single rotation
+                return node(left._key, left._value, left._left, node(key, value, left._right, right))
+            mid = left._right           # double rotation
+            return node(mid._key, mid._value, node(left._key, left._value, left._left, mid._left),
+                        node(key, value, mid._right, right))
+        if hr > hl + 1:
+            rl = right._left._height if right._left is not None else 0
+            rr = right._right._height if right._right is not None else 0
+            if rr >= rl:                # single rotation
+                return node(right._key, right._value, node(key, value, left, right._left), right._right)
+            mid = right._left           # double rotation
+            return node(mid._key, mid._value, node(key, value, left, mid._left),
+                        node(right._key, right._value, mid._right, right._right))
+        return node(key, value, left, right)
+
+    def _rebuild(self, path, node):
+        """Copy the recorded path bottom-up above the new subtree node and return the new root."""
+        for parent, went_left in reversed(path):
+            if went_left:
+                node = self._balance(parent._key, parent._value, node, parent._right)
+            else:
+                node = self._balance(parent._key, parent._value, parent._left, node)
+        return node
+
+    def _remove_min(self, node):
+        """Return (new subtree without its minimum, node holding the minimum)."""
+        path = []
+        while node._left is not None:
+            path.append((node, True))
+            node = node._left
+        return self._rebuild(path, node._right), node
+
+    # -------------------- public accessors --------------------
+    def __len__(self):
+        """Return the number of items in the map."""
+        return self._version[1]
+
+    def __getitem__(self, k):
+        """Return value associated with key k (raise KeyError if not found)."""
+        node = self._version[0]
+        while node is not None:
+            if k < node._key:
+                node = node._left
+            elif node._key < k:
+                node = node._right
+            else:
+                return node._value
+        raise KeyError('Key Error: ' + repr(k))
+
+    def snapshot(self):
+        """Return a read-only version of the map as it is now, in O(1) time."""
+        snap = type(self)()
+        snap._version = self._version
+        snap._frozen = True
+        return snap
+
+    def is_snapshot(self):
+        """Return True if the map is a read-only snapshot."""
+        return self._frozen
+
+    def find_min(self):
+        """Return (key, value) pair with minimum key (or None if empty)."""
+        node = self._version[0]
+        if node is None:
+            return None
+        while node._left is not None:
+            node = node._left
+        return node._key, node._value
+
+    def find_ge(self, k):
+        """Return (key, value) pair with least key greater than or equal to k.
+
+        Return None if there does not exists such a key.
+        """
+        node, best = self._version[0], None
+        while node is not None:
+            if node._key < k:
+                node = node._right
+            else:
+                best = node             # candidate; look for a smaller one on the left
+                node = node._left
+        return (best._key, best._value) if best is not None else None
+
+    def find_range(self, start, stop, reverse=False):
+        """Iterate all (key, value) pairs such that start <= key < stop.
+
+        If start is None, iteration begins with minimum key of map.
+        If stop is None, iteration continues through the maximum key of map.
+        If reverse is True, pairs are reported in decreasing key order.
+        The iteration reads the version current when it starts and is not
+        affected by later updates.
+        """
+        for node in self._range_nodes(start, stop, reverse):
+            yield node._key, node._value
+
+    def _range_nodes(self, start, stop, reverse=False):
+        """Generate nodes with start <= key < stop in order, using an explicit stack."""
+        stack = []
+        node = self._version[0]
+        if not reverse:
+            while node is not None:     # push path of nodes with key >= start
+                if start is None or not node._key < start:
+                    stack.append(node)
+                    node = node._left
+                else:
+                    node = node._right
+            while stack:
+                node = stack.pop()
+                if stop is not None and not node._key < stop:
+                    return
+                yield node
+                node = node._right
+                while node is not None:
+                    stack.append(node)
+                    node = node._left
+        else:
+            while node is not None:     # push path of nodes with key < stop
+                if stop is None or node._key < stop:
+                    stack.append(node)
+                    node = node._right
+                else:
+                    node = node._left
+            while stack:
+                node = stack.pop()
+                if start is not None and node._key < start:
+                    return
+                yield node
+                node = node._left
+                while node is not None:
+                    stack.append(node)
+                    node = node._right
+
+    def __iter__(self):
+        """Generate an iteration of all keys in the map in order."""
+        for node in self._range_nodes(None, None):
+            yield node._key
+
+    def __reversed__(self):
+        """Generate an iteration of all keys in the map in reverse order."""
+        for node in self._range_nodes(None, None, True):
+            yield node._key
+
+    # -------------------- public update methods --------------------
+    def __setitem__(self, k, v):
+        """Assign value v to key k, overwriting existing value if present."""
+        self._check_mutable()
+        root, size = self._version
+        path = []
+        node = root
+        while node is not None:
+            if k < node._key:
+                path.append((node, True))
+                node = node._left
+            elif node._key < k:
+                path.append((node, False))
+                node = node._right
+            else:
+                # replace value; heights are unchanged, so the path is only copied
+                node = self._Node(node._key, v, node._left, node._right)
+                break
+        else:
+            node = self._Node(k, v)
+            size += 1
+        self._version = (self._rebuild(path, node), size)
+
+    def __delitem__(self, k):
+        """Remove item associated with key k (raise KeyError if not found)."""
+        self._check_mutable()
+        root, size = self._version
+        path = []
+        node = root
+        while node is not None:
+            if k < node._key:
+                path.append((node, True))
+                node = node._left
+            elif node._key < k:
+                path.append((node, False))
+                node = node._right
+            else:
+                break
+        else:
+            raise KeyError('Key Error: ' + repr(k))
+        if node._left is None:
+            node = node._right
+        elif node._right is None:
+            node = node._left
+        else:
+            # replace with successor, copied out of the right subtree
+            right, successor = self._remove_min(node._right)
+            node = self._balance(successor._key, successor._value, node._left, right)
+        self._version = (self._rebuild(path, node), size - 1)
@@ -0,0 +1,70 @@
+import TreeMap
+
+
+class SplayTreeMap(TreeMap.TreeMap):
+    """Sorted map implementation using a splay tree.
+
+    Every access moves the accessed node to the root, so recently used keys
+    are found near the top of the tree.
+    """
+
+    _reads_mutate = True    # every lookup splays
+
+    # -------------------- splay operation --------------------
+    def _splay(self, p):
+        x = p.node      # walk nodes directly; _rotate only needs p's node
+        while x._parent is not None:
+            y = x._parent
+            z = y._parent
+            if z is None:
+                # zig case
+                self._rotate(p)
+            elif (y is z._left) == (x is y._left):
+                # zig-zig case
+                self._rotate(self._make_position(y))    # move PARENT up
+                self._rotate(p)                         # then move p up
+            else:
+                # zig-zag case
+                self._rotate(p)         # move p up
+                self._rotate(p)         # move p up again
+
+    # -------------------- override balancing hooks --------------------
+    def _rebalance_insert(self, p):
+        self._splay(p)
+
+    def _rebalance_delete(self, p):
+        if p is not None:
+            self._splay(p)
+
+    def _rebalance_access(self, p):
+        self._splay(p)
+
+    # -------------------- iteration --------------------
+    def _range_nodes(self, start, stop, reverse=False):
+        """Generate nodes with start <= key < stop in order by following parent links.
+
+        Lookups splay the tree, so a stack of pending ancestors could go stale
+        while a caller reads values inside the loop; successor steps cannot.
+        """
+        if self._root is None:
+            return
+        if not reverse:
+            if start is None:
+                node = self._node_first(self._root)
+            else:
+                node = self._node_search(self._root, start)
+                if node._element._key < start:
+                    node = self._node_after(node)
+            while node is not None and (stop is None or node._element._key < stop):
+                yield node
+                node = self._node_after(node)
+        else:
+            if stop is None:
+                node = self._node_last(self._root)
+            else:
+                node = self._node_search(self._root, stop)
+                if not node._element._key < stop:
+                    node = self._node_before(node)
+            while node is not None and (start is None or not node._element._key < start):
+                yield node
+                node = self._node_before(node)
@@ -15,81 +15,166 @@ class TreeMap(LinkedBinaryTree.LinkedBinaryTree, MapBase.MapBase):
             """Return value of map's key-value pair."""
             return self.element()._value
 
+    # -------------------- nested Cursor class --------------------
+    class Cursor:
+        """Reusable bidirectional cursor over the items of a map, in key order.
+
+        A fresh cursor sits before the first item. Moving past either end leaves
+        the cursor just outside the map, from where it can step back in.
+        Lookups and insertions leave a cursor usable; a deletion that removes the
+        node under it makes it raise ValueError until it is seeked again.
+        """
+        __slots__ = ('_map', '_node', '_item', '_at_end')
+
+        def __init__(self, container):
+            """Constructor should not be invoked by user. Use the map's cursor()."""
+            self._map = container
+            self._node = None
+            self._item = None
+            self._at_end = False    # True if past the last item, False if before the first
+
+        def _move(self, node):
+            self._node = node
+            self._item = node._element if node is not None else None
+            return self._current()
+
+        def _current(self):
+            node = self._node
+            if node is None:
+                return None
+            # a deleted node is deprecated, and a node with two children survives
+            # its deletion holding the item of its predecessor instead
+            if node._parent is node or node._element is not self._item:
+                raise ValueError('cursor is no longer valid')
+            return self._item._key, self._item._value
+
+        def item(self):
+            """Return (key, value) pair under the cursor (or None if outside the map)."""
+            return self._current()
+
+        def seek(self, k):
+            """Move to the item with least key greater than or equal to k and return it."""
+            t = self._map
+            node = None
+            if t._root is not None:
+                node = t._node_search(t._root, k)
+                if node._element._key < k:
+                    node = t._node_after(node)
+            self._at_end = node is None
+            return self._move(node)
+
+        def next(self):
+            """Move to the next item and return it (or None when moving past the last)."""
+            t = self._map
+            node = self._node
+            if node is None:
+                if self._at_end or t._root is None:
+                    return None
+                return self._move(t._node_first(t._root))
+            self._current()     # check validity
+            node = t._node_after(node)
+            self._at_end = node is None
+            return self._move(node)
+
+        def prev(self):
+            """Move to the previous item and return it (or None when moving before the first)."""
+            t = self._map
+            node = self._node
+            if node is None:
+                if not self._at_end or t._root is None:
+                    return None
+                self._at_end = False
+                return self._move(t._node_last(t._root))
+            self._current()     # check validity
+            return self._move(t._node_before(node))
+
     # -------------------- nonpublic utilities --------------------
+    def _node_search(self, node, k):
+        """Return node of the subtree rooted at node having key k, or last node searched.
+
+        Walks nodes directly, without recursion or Position objects.
+        """
+        while True:
+            key = node._element._key
+            if k == key:
+                return node
+            child = node._left if k < key else node._right
+            if child is None:
+                return node
+            node = child
+
     def _subtree_search(self, p, k):
         """Return Position of p's subtree having key k, or last node searched."""
-        if k == p.key():
-            return p
-        elif k < p.key():
-            if self.left(p) is not None:
-                return self._subtree_search(self.left(p), k)
-        else:
-            if self.right(p) is not None:
-                return self._subtree_search(self.right(p), k)
-        return p
+        return self._make_position(self._node_search(p.node, k))
+
+    def _node_first(self, node):
+        """Return the node of the first item in the subtree rooted at node."""
+        while node._left is not None:
+            node = node._left
+        return node
+
+    def _node_last(self, node):
+        """Return the node of the last item in the subtree rooted at node."""
+        while node._right is not None:
+            node = node._right
+        return node
+
+    def _node_before(self, node):
+        """Return the node just before node in the natural order (or None)."""
+        if node._left is not None:
+            return self._node_last(node._left)
+        above = node._parent
+        while above is not None and node is above._left:    # walk upward
+            node = above
+            above = node._parent
+        return above
+
+    def _node_after(self, node):
+        """Return the node just after node in the natural order (or None)."""
+        if node._right is not None:
+            return self._node_first(node._right)
+        above = node._parent
+        while above is not None and node is above._right:   # walk upward
+            node = above
+            above = node._parent
+        return above
 
     def _subtree_first_position(self, p):
         """Return Position of first item in subtree rooted at p."""
-        walk = p
-        while self.left(walk) is not None:
-            walk = self.left(walk)
-        return walk
+        return self._make_position(self._node_first(p.node))
 
     def _subtree_last_position(self, p):
         """Return Position of last item in subtree rooted at p."""
-        walk = p
-        while self.right(walk) is not None:
-            walk = self.right(walk)
-        return walk
+        return self._make_position(self._node_last(p.node))
 
     def first(self):
         """Return the first Position in the tree (or None if empty)."""
-        return self._subtree_first_position(self.root()) if len(self) > 0 else None
+        return self._make_position(self._node_first(self._root)) if len(self) > 0 else None
 
     def last(self):
         """Return the last Position in the tree (or None if empty)."""
-        return self._subtree_last_position(self.root()) if len(self) > 0 else None
+        return self._make_position(self._node_last(self._root)) if len(self) > 0 else None
 
     def before(self, p):
         """Return the Position just before p in the natural order.
 
         Return None if p is the first position.
         """
-        self._validate(p)
-        if self.left(p):
-            return self._subtree_last_position(self.left(p))
-        else:
-            # walk upward
-            walk = p
-            above = self.parent(walk)
-            while above is not None and walk == self.left(above):
-                walk = above
-                above = self.parent(walk)
-            return above
+        return self._make_position(self._node_before(self._validate(p)))
 
     def after(self, p):
         """Return the position just after p in the natural order.
 
         Return None if p is the last position.
         """
-        self._validate(p)
-        if self.right(p):
-            return self._subtree_first_position(self.right(p))
-        else:
-            # walk upward
-            walk = p
-            above = self.parent(walk)
-            while above is not None and walk == self.right(above):
-                walk = above
-                above = self.parent(walk)
-            return above
+        return self._make_position(self._node_after(self._validate(p)))
 
     def find_position(self, k):
         """Return position with key k, or else neighbour (or None if empty)."""
         if self.is_empty():
             return None
         else:
-            p = self._subtree_search(self.root(), k)
+            p = self._make_position(self._node_search(self._root, k))
             self._rebalance_access(p)   # hook for balanced tree subclasses
             return p
 
@@ -98,8 +183,8 @@ class TreeMap(LinkedBinaryTree.LinkedBinaryTree, MapBase.MapBase):
         if self.is_empty():
             return None
         else:
-            p = self.first()
-            return p.key(), p.value()   # tuple
+            item = self._node_first(self._root)._element
+            return item._key, item._value   # tuple
 
     def find_ge(self, k):
         """Return (key, value) pair with least key greater than or equal to k.
@@ -109,64 +194,361 @@ class TreeMap(LinkedBinaryTree.LinkedBinaryTree, MapBase.MapBase):
         if self.is_empty():
             return None
         else:
-            p = self.find_position(k)
-            if p.key() < k:
-                p = self.after(p)
-            return p.key(), p.value() if p is not None else None
+            node = self._node_search(self._root, k)
+            self._rebalance_access(self._make_position(node))   # hook for balanced tree subclasses
+            if node._element._key < k:
+                node = self._node_after(node)
+            return (node._element._key, node._element._value) if node is not None else None
 
-    def find_range(self, start, stop):
+    def find_range(self, start, stop, reverse=False):
         """Iterate all (key, value) pairs such that start <= key < stop.
 
         If start is None, iteration begins with minimum key of map.
         If stop is None, iteration continues through the maximum key of map.
+        If reverse is True, pairs are reported in decreasing key order.
         """
-        if not self.is_empty():
-            if start is None:
-                p = self.first()
-            else:
-                # we initialize p with logic similar to find_ge
-                p = self.find_position(start)
-                if p.key() < start:
-                    p = self.after(p)
-            while p is not None and (stop is None or p.key() < stop):
-                yield p.key(), p.value()    # tuple
-                p = self.after(p)
+        for node in self._range_nodes(start, stop, reverse):
+            item = node._element
+            yield item._key, item._value    # tuple
+
+    def _range_nodes(self, start, stop, reverse=False):
+        """Generate nodes with start <= key < stop in order, using an explicit stack.
+
+        The stack holds the ancestors still to be reported, so each step costs
+        amortized O(1) without Position objects or walks back up through parents.
+        """
+        stack = []
+        node = self._root
+        if not reverse:
+            while node is not None:     # push path of nodes with key >= start
+                if start is None or not node._element._key < start:
+                    stack.append(node)
+                    node = node._left
+                else:
+                    node = node._right
+            while stack:
+                node = stack.pop()
+                if stop is not None and not node._element._key < stop:
+                    return
+                yield node
+                node = node._right
+                while node is not None:
+                    stack.append(node)
+                    node = node._left
+        else:
+            while node is not None:     # push path of nodes with key < stop
+                if stop is None or node._element._key < stop:
+                    stack.append(node)
+                    node = node._right
+                else:
+                    node = node._left
+            while stack:
+                node = stack.pop()
+                if start is not None and node._element._key < start:
+                    return
+                yield node
+                node = node._left
+                while node is not None:
+                    stack.append(node)
+                    node = node._right
+
+    def cursor(self):
+        """Return a new Cursor positioned before the first item of the map."""
+        return self.Cursor(self)
 
     def __getitem__(self, k):
         """Return value associated with key k (raise KeyError if not found)."""
         if self.is_empty():
             raise KeyError('Key Error: ' + repr(k))
         else:
-            p = self._subtree_search(self.root(), k)
-            self._rebalance_access(p)   # hook for balanced tree subclasses
-            if k != p.key():
+            node = self._node_search(self._root, k)
+            self._rebalance_access(self._make_position(node))   # hook for balanced tree subclasses
+            item = node._element
+            if k != item._key:
                 raise KeyError('Key Error: ' + repr(k))
-            return p.value()
+            return item._value
 
     def __setitem__(self, k, v):
         """Assign value v to key k, overwriting existing value if present."""
         if self.is_empty():
             leaf = self._add_root(self._Item(k, v))     # from LinkedBinaryTree
         else:
-            p = self._subtree_search(self.root(), k)
-            if p.key() == k:
-                p.element()._value = v      # replace exiting item value
-                self._rebalance_access(p)   # hook for balanced tree subclasses
+            node = self._node_search(self._root, k)
+            key = node._element._key
+            p = self._make_position(node)
+            if key == k:
+                node._element._value = v    # replace exiting item value
+                self._rebalance_replace(p)  # hook for balanced tree subclasses
                 return
             else:
                 item = self._Item(k, v)
-                if p.key() < k:
+                if key < k:
                     leaf = self._add_right(p, item)     # inherited from LinkedBinaryTree
                 else:
                     leaf = self._add_left(p, item)      # inherited from LinkedBinaryTree
-            self._rebalance_insert(leaf)                # hook for balanced tree subclasses
+        self._rebalance_insert(leaf)    # hook for balanced tree subclasses
+
+    # -------------------- bulk construction --------------------
+    @classmethod
+    def from_sorted(cls, items):
+        """Create a map from (key, value) pairs given in strictly increasing key order.
+
+        The tree is built perfectly balanced in O(n) time, without per-item searches.
+        """
+        t = cls()
+        items = [t._Item(k, v) for k, v in items]
+        t._check_sorted(items)
+        t._build(items)
+        return t
+
+    def update_sorted(self, items):
+        """Insert (key, value) pairs given in strictly increasing key order in O(n + m) time.
+
+        Values of keys already present are overwritten. The tree is rebuilt
+        perfectly balanced, so existing positions become invalid.
+        """
+        incoming = [self._Item(k, v) for k, v in items]
+        self._check_sorted(incoming)
+        current = [node._element for node in self._inorder_nodes()]
+        self._release_nodes()
+        self._build(self._merge_items(current, incoming))
+
+    def merge(self, other):
+        """Return a new map holding the items of this map and of other in O(n + m) time.
+
+        Where both maps hold a key, the value from other is used.
+        """
+        mine = [self._Item(node._element._key, node._element._value) for node in self._inorder_nodes()]
+        theirs = [self._Item(node._element._key, node._element._value) for node in other._inorder_nodes()]
+        result = type(self)()
+        result._build(self._merge_items(mine, theirs))
+        return result
+
+    def _inorder_nodes(self):
+        """Generate the nodes of the tree in key order."""
+        return self._range_nodes(None, None)
+
+    def _release_nodes(self):
+        """Deprecate every node and empty the tree."""
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if node._left is not None:
+                stack.append(node._left)
+            if node._right is not None:
+                stack.append(node._right)
+            node._parent = node     # convention for deprecated nodes
+        self._root = None
+        self._size = 0
+        self._invalidate_metrics()
+
+    @staticmethod
+    def _check_sorted(items):
+        """Raise ValueError unless the _Items are in strictly increasing key order."""
+        for i in range(1, len(items)):
+            if not items[i - 1] < items[i]:
+                raise ValueError('items must be in strictly increasing key order')
+
+    @staticmethod
+    def _merge_items(a, b):
+        """Return merged list of two sorted _Item lists, preferring b on equal keys."""
+        result = []
+        i = j = 0
+        while i < len(a) and j < len(b):
+            if b[j] < a[i]:
+                result.append(b[j])
+                j += 1
+            elif a[i] < b[j]:
+                result.append(a[i])
+                i += 1
+            else:                   # equal keys
+                result.append(b[j])
+                i += 1
+                j += 1
+        result.extend(a[i:])
+        result.extend(b[j:])
+        return result
+
+    def _build(self, items):
+        """Replace the contents of an empty tree with a balanced tree of sorted _Items."""
+        max_depth = len(items).bit_length() - 1     # depth of deepest level
+        self._root = self._build_subtree(items, 0, len(items), None, 0, max_depth)
+        self._size = len(items)
+        self._invalidate_metrics()
+
+    def _build_subtree(self, items, lo, hi, parent, depth, max_depth):
+        """Return root node of a perfectly balanced subtree holding items[lo:hi]."""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = self._Node(items[mid], parent)
+        node._left = self._build_subtree(items, lo, mid, node, depth + 1, max_depth)
+        node._right = self._build_subtree(items, mid + 1, hi, node, depth + 1, max_depth)
+        self._rebalance_build(node, depth, max_depth)   # hook for balanced tree subclasses
+        return node
+
+    # -------------------- batch operations --------------------
+    def _finger_search(self, finger, k):
+        """Return (node, floor): node having key k, or last node searched, and a node with key <= k.
+
+        The search climbs from finger, whose key must not exceed k, only until
+        k lies within the key range of the subtree, and descends from there.
+        With finger None the search starts at the root. floor is None only if
+        no key on the way is at most k.
+        """
+        node = finger
+        if node is None:
+            node = self._root
+        else:
+            while node._parent is not None:
+                parent = node._parent
+                if node is parent._left and k < parent._element._key:
+                    break       # keys under node lie strictly between finger's bound and parent's key
+                node = parent
+        floor = finger
+        while True:
+            key = node._element._key
+            if k == key:
+                return node, node
+            if k < key:
+                child = node._left
+            else:
+                floor = node
+                child = node._right
+            if child is None:
+                return node, floor
+            node = child
+
+    def get_many(self, keys, default=None):
+        """Return list of values for the given keys, in the given order (default for missing keys).
+
+        Keys are looked up in sorted order, each search starting from the previous one.
+        """
+        keys = list(keys)
+        result = [default] * len(keys)
+        finger = None
+        for i in sorted(range(len(keys)), key=keys.__getitem__):
+            if self._root is None:
+                break
+            k = keys[i]
+            node, finger = self._finger_search(finger, k)
+            self._rebalance_access(self._make_position(node))   # hook for balanced tree subclasses
+            if k == node._element._key:
+                result[i] = node._element._value
+        return result
+
+    def set_many(self, items):
+        """Assign value v to key k for every (k, v) pair; the last pair wins for a repeated key.
+
+        Pairs are inserted in sorted order, each search starting from the
+        previous one. A batch at least a quarter the size of the map is merged
+        in with update_sorted instead, rebuilding the tree balanced in O(n + m)
+        time (which invalidates existing positions).
+        """
+        items = sorted(items, key=lambda item: item[0])     # stable, so later pairs stay later
+        if 4 * len(items) >= len(self):
+            unique = []
+            for k, v in items:
+                if unique and unique[-1][0] == k:
+                    unique[-1] = (k, v)
+                else:
+                    unique.append((k, v))
+            self.update_sorted(unique)
+            return
+        finger = None
+        for k, v in items:
+            node, finger = self._finger_search(finger, k)
+            p = self._make_position(node)
+            key = node._element._key
+            if k == key:
+                node._element._value = v   # replace existing item value
+                self._rebalance_replace(p)  # hook for balanced tree subclasses
+            else:
+                item = self._Item(k, v)
+                leaf = self._add_right(p, item) if key < k else self._add_left(p, item)
+                self._rebalance_insert(leaf)    # hook for balanced tree subclasses
+                finger = leaf.node
+
+    def delete_many(self, keys):
+        """Remove the items with the given keys and return how many were removed.
+
+        Keys not in the map are ignored. Keys are removed in sorted order, each
+        search starting from the previous deletion. A batch at least a quarter
+        the size of the map rebuilds the tree from the items kept in O(n + m)
+        time instead (which invalidates existing positions).
+        """
+        keys = sorted(keys)
+        if not keys or self.is_empty():
+            return 0
+        if 4 * len(keys) >= len(self):
+            kept = []
+            i = 0
+            for node in self._inorder_nodes():
+                key = node._element._key
+                while i < len(keys) and keys[i] < key:
+                    i += 1
+                if i == len(keys) or keys[i] != key:
+                    kept.append(node._element)
+            return self._rebuild_keeping(kept)
+        return self._delete_sorted(keys)
+
+    def delete_range(self, start, stop):
+        """Remove all items such that start <= key < stop and return how many were removed.
+
+        If start is None, removal begins with minimum key of map.
+        If stop is None, removal continues through the maximum key of map.
+        A span of at least a quarter of the map rebuilds the tree from the
+        items outside it in O(n) time (which invalidates existing positions);
+        smaller spans are deleted one by one, each starting from the previous.
+        """
+        doomed = [node._element._key for node in self._range_nodes(start, stop)]
+        if not doomed:
+            return 0
+        if 4 * len(doomed) >= len(self):
+            kept = []
+            if start is not None:
+                kept.extend(node._element for node in self._range_nodes(None, start))
+            if stop is not None:
+                kept.extend(node._element for node in self._range_nodes(stop, None))
+            return self._rebuild_keeping(kept)
+        return self._delete_sorted(doomed)
+
+    def _delete_sorted(self, keys):
+        """Delete items with the given sorted keys one by one and return how many were removed."""
+        removed = 0
+        finger = None
+        for k in keys:
+            if self._root is None:
+                break
+            node, floor = self._finger_search(finger, k)
+            if k != node._element._key:
+                finger = floor
+                continue
+            if node._left is not None and node._right is not None:
+                finger = node   # survives, holding the item of its predecessor
+            else:
+                finger = self._node_before(node)
+            self.delete(self._make_position(node))
+            removed += 1
+        return removed
+
+    def _rebuild_keeping(self, kept):
+        """Rebuild the tree balanced from the sorted _Items kept and return how many items were dropped."""
+        removed = len(self) - len(kept)
+        if removed:
+            self._release_nodes()
+            self._build(kept)
+        return removed
 
     def __iter__(self):
         """Generate an iteration of all keys in the map in order."""
-        p = self.first()
-        while p is not None:
-            yield p.key()
-            p = self.after(p)
+        for node in self._range_nodes(None, None):
+            yield node._element._key
+
+    def __reversed__(self):
+        """Generate an iteration of all keys in the map in reverse order."""
+        for node in self._range_nodes(None, None, True):
+            yield node._element._key
 
     def delete(self, p):
         """Remove the item at given Position."""
@@ -183,8 +565,8 @@ class TreeMap(LinkedBinaryTree.LinkedBinaryTree, MapBase.MapBase):
     def __delitem__(self, k):
         """Remove item associated with key k (raise KeyError if not found)."""
         if not self.is_empty():
-            p = self._subtree_search(self.root(), k)
-            if k == p.key():
+            p = self._make_position(self._node_search(self._root, k))
+            if k == p.node._element._key:
                 self.delete(p)
                 return
             self._rebalance_access(p)   # hook for balanced tree subclasses
@@ -193,6 +575,8 @@ class TreeMap(LinkedBinaryTree.LinkedBinaryTree, MapBase.MapBase):
     def _rebalance_insert(self, p): pass
     def _rebalance_delete(self, p): pass
     def _rebalance_access(self, p): pass
+    def _rebalance_replace(self, p): self._rebalance_access(p)     # replacing a value also accesses it
+    def _rebalance_build(self, node, depth, max_depth): pass
 
     def _relink(self, parent, child, make_left_child):
         """Relink parent node with child node (we allow child to be None)."""
@@ -200,14 +584,18 @@ class TreeMap(LinkedBinaryTree.LinkedBinaryTree, MapBase.MapBase):
             parent._left = child
         else:
             parent._right = child
+        if child is not None:
+            child._parent = parent
+        self._invalidate_metrics()
 
     def _rotate(self, p):
         """Rotate Position p above its parent."""
-        x = p._node
+        x = p.node
         y = x._parent
         z = y._parent
         if z is None:
-            x._parent = None                    # x becomes root
+            self._root = x                      # x becomes root
+            x._parent = None
         else:
             self._relink(z, x, y == z._left)    # x becomes a direct child of z
         # now rotate x and y, including transfer of middle subtree
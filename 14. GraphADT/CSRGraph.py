@@ -0,0 +1,330 @@
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from multiprocessing import Pool, shared_memory
+
+
+class CSRGraph:
+    """Read-only snapshot of a graph in compressed sparse row form.
+
+    Vertices are packed into dense integer ids 0..n-1. The outgoing neighbours
+    of vertex i are targets[offsets[i]:offsets[i+1]]; a directed snapshot keeps
+    a second pair of arrays for incoming neighbours.
+    """
+
+    # binary file layout: header, offsets, targets, [in_offsets, in_targets], side table
+    _MAGIC = b'PyADTcsr'
+    _VERSION = 1
+    _HEADER = struct.Struct('<8sIIQQQQQ')   # magic, version, flags, n, m, in_m, edges, side table size
+    _DIRECTED = 1
+    _BIG_ENDIAN = 2                         # arrays are stored in native byte order
+
+    def __init__(self, vertices, offsets, targets, in_offsets=None, in_targets=None, edge_total=None):
+        """Do not call constructor directly. Use CSRGraph.from_graph(g) or Graph's freeze()."""
+        self._vertices = vertices
+        self._index = None      # Vertex -> id map, built lazily on first index() call
+        self._offsets = offsets
+        self._targets = targets
+        # only keep second pair of arrays for directed graph; use alias for undirected
+        self._in_offsets = in_offsets if in_offsets is not None else offsets
+        self._in_targets = in_targets if in_targets is not None else targets
+        self._edge_total = len(targets) if edge_total is None else edge_total
+        self._mmap = None       # file mapping backing the arrays of a loaded snapshot
+        self._side = None       # (position, size) of a loaded snapshot's side table
+
+    @classmethod
+    def from_graph(cls, g):
+        """Return a CSRGraph snapshot of Graph g.
+
+        Vertex ids follow g's dense vertex ids, skipping vacant ids of removed vertices.
+        """
+        vertices = [v for v in g._vertex_list if v is not None] if g._vacant else list(g._vertex_list)
+        index = {v: i for i, v in enumerate(vertices)}
+        offsets, targets = cls._pack(vertices, index, g._outgoing)
+        if g.is_directed():
+            in_offsets, in_targets = cls._pack(vertices, index, g._incoming)
+            snapshot = cls(vertices, offsets, targets, in_offsets, in_targets)
+        else:
+            snapshot = cls(vertices, offsets, targets, edge_total=g.edge_count())
+        snapshot._index = index
+        return snapshot
+
+    @staticmethod
+    def _pack(vertices, index, adj):
+        """Return (offsets, targets) arrays for the adjacency map adj."""
+        offsets = array('q', [0]) * (len(vertices) + 1)
+        targets = array('q')
+        for i, v in enumerate(vertices):
+            targets.extend([index[w] for w in adj[v]])  # secondary map keys are neighbours
+            offsets[i + 1] = len(targets)
+        return offsets, targets
+
+    # -------------------- public accessors --------------------
+    def is_directed(self):
+        """Return True if the snapshot was taken from a directed graph."""
+        return self._in_targets is not self._targets
+
+    def vertex_count(self):
+        """Return the number of vertices in the snapshot."""
+        return len(self._offsets) - 1
+
+    def edge_count(self):
+        """Return the number of edges in the snapshot."""
+        return self._edge_total
+
+    def vertices(self):
+        """Return the list of Vertex objects, indexed by their dense id."""
+        return self._require_vertices()
+
+    def vertex(self, i):
+        """Return the Vertex with dense id i."""
+        return self._require_vertices()[i]
+
+    def index(self, v):
+        """Return the dense id of Vertex v (raise KeyError if not in snapshot)."""
+        if self._index is None:
+            self._index = {u: i for i, u in enumerate(self._require_vertices())}
+        return self._index[v]
+
+    def element(self, i):
+        """Return the element of the vertex with dense id i."""
+        if self._vertices is not None:
+            return self._vertices[i].element()
+        vertex_elements = self._side_table()[0]
+        return vertex_elements[i] if vertex_elements is not None else None
+
+    def _require_vertices(self):
+        """Return the list of Vertex objects, or raise ValueError for a loaded snapshot."""
+        if self._vertices is None:
+            raise ValueError('snapshot loaded from a file has no Vertex objects')
+        return self._vertices
+
+    def degree(self, i, outgoing=True):
+        """Return number of (outgoing) edges incident to vertex id i.
+
+        If snapshot is directed, optional parameter used to count incoming edges.
+        """
+        offsets = self._offsets if outgoing else self._in_offsets
+        return offsets[i + 1] - offsets[i]
+
+    def degrees(self, outgoing=True):
+        """Return an array holding the (outgoing) degree of every vertex id."""
+        offsets = self._offsets if outgoing else self._in_offsets
+        return array('q', map(int.__sub__, offsets[1:], offsets[:-1]))
+
+    def neighbors(self, i, outgoing=True):
+        """Return a read-only view of the (outgoing) neighbour ids of vertex id i.
+
+        If snapshot is directed, optional parameter used to request incoming neighbours.
+        """
+        offsets = self._offsets if outgoing else self._in_offsets
+        targets = self._targets if outgoing else self._in_targets
+        return memoryview(targets)[offsets[i]:offsets[i + 1]].toreadonly()
+
+    # -------------------- binary file format --------------------
+    def save(self, path, vertex_elements=None, edge_elements=None):
+        """Write the snapshot to a compact binary file at path.
+
+        The file holds a versioned header followed by the CSR arrays. If given,
+        vertex_elements (indexed by vertex id) and edge_elements (aligned with the
+        outgoing target array) are pickled into a side table at the end, so
+        loading a file from an untrusted source can run arbitrary code.
+        """
+        side = b''
+        if vertex_elements is not None or edge_elements is not None:
+            side = pickle.dumps((vertex_elements, edge_elements), pickle.HIGHEST_PROTOCOL)
+        flags = self._BIG_ENDIAN if sys.byteorder == 'big' else 0
+        arrays = [self._offsets, self._targets]
+        if self.is_directed():
+            flags |= self._DIRECTED
+            arrays += [self._in_offsets, self._in_targets]
+        with open(path, 'wb') as f:
+            f.write(self._HEADER.pack(self._MAGIC, self._VERSION, flags, self.vertex_count(),
+                                      len(self._targets), len(self._in_targets) if self.is_directed() else 0,
+                                      self._edge_total, len(side)))
+            for a in arrays:
+                f.write(a)
+            f.write(side)
+
+    @classmethod
+    def load(cls, path):
+        """Return a read-only snapshot memory-mapped from a file written by save.
+
+        Arrays are used in place rather than copied, so queries can start at once
+        and processes mapping the same file share its pages. Vertex ids take the
+        place of Vertex objects; element(i) reads the side table on first use.
+        The side table is unpickled, so only load files from trusted sources.
+        Raise ValueError if the file is not a graph file or is shorter than its
+        header says.
+        """
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, flags, n, m, in_m, edge_total, side_size = cls._HEADER.unpack_from(mm)
+        except struct.error:
+            mm.close()
+            raise ValueError('not a graph file: ' + repr(path))
+        if magic != cls._MAGIC or version != cls._VERSION or bool(flags & cls._BIG_ENDIAN) != (sys.byteorder == 'big'):
+            mm.close()
+            raise ValueError('unsupported graph file format: ' + repr(path))
+        counts = (n + 1, m, n + 1, in_m) if flags & cls._DIRECTED else (n + 1, m)
+        if len(mm) < cls._HEADER.size + 8 * sum(counts) + side_size:     # truncated file
+            mm.close()
+            raise ValueError('unsupported graph file format: ' + repr(path))
+        view = memoryview(mm)
+        pos = cls._HEADER.size
+        arrays = []
+        for count in counts:
+            arrays.append(view[pos:pos + 8 * count].cast('q'))
+            pos += 8 * count
+        view.release()
+        snapshot = cls(None, *arrays, edge_total=edge_total)
+        snapshot._mmap = mm
+        snapshot._side = (pos, side_size)
+        return snapshot
+
+    def _side_table(self):
+        """Return (vertex_elements, edge_elements) of a loaded snapshot."""
+        if self._side is None or self._side[1] == 0:
+            return None, None
+        if not isinstance(self._side, list):    # unpickle once, on first use
+            pos, size = self._side
+            self._side = list(pickle.loads(self._mmap[pos:pos + size]))
+        return self._side
+
+    def close(self):
+        """Release the file mapping of a loaded snapshot.
+
+        Views returned by neighbors() must be released first.
+        """
+        if self._mmap is not None:
+            for a in (self._offsets, self._targets, self._in_offsets, self._in_targets):
+                a.release()
+            self._mmap.close()
+            self._mmap = None
+
+    # -------------------- traversals --------------------
+    def BFS(self, s, outgoing=True):
+        """Perform BFS starting at vertex id s and return the parent array.
+
+        parent[v] is the id from which v was discovered, parent[s] is s, and
+        undiscovered vertices are mapped to -1.
+        """
+        parent = array('q', [-1]) * self.vertex_count()
+        self._bfs(s, parent, None, outgoing)
+        return parent
+
+    def distances(self, s, outgoing=True):
+        """Return an array of BFS hop distances from vertex id s (-1 if unreachable)."""
+        distance = array('q', [-1]) * self.vertex_count()
+        self._bfs(s, None, distance, outgoing)
+        return distance
+
+    def _bfs(self, s, parent, distance, outgoing):
+        """Fill parent and/or distance arrays with a BFS from vertex id s."""
+        offsets = self._offsets if outgoing else self._in_offsets
+        targets = self._targets if outgoing else self._in_targets
+        _bfs_kernel(offsets, targets, s, parent, distance)
+
+    def batch_BFS(self, sources, parents=False, outgoing=True, processes=None, chunksize=16):
+        """Return a list with one BFS result array per vertex id in sources.
+
+        Each result holds hop distances (-1 if unreachable), or the parent array
+        as returned by BFS if parents is True. Traversals are spread over a pool
+        of processes (os.cpu_count() by default) that read the adjacency arrays
+        from one shared memory block instead of receiving a copy each.
+        """
+        sources = list(sources)
+        if processes == 1 or len(sources) <= 1:
+            search = self.BFS if parents else self.distances
+            return [search(s, outgoing) for s in sources]
+        offsets = self._offsets if outgoing else self._in_offsets
+        targets = self._targets if outgoing else self._in_targets
+        n, m = len(offsets) - 1, len(targets)
+        shm = shared_memory.SharedMemory(create=True, size=8 * (n + 1 + m))
+        try:
+            buf = shm.buf.cast('q')
+            buf[:n + 1] = offsets
+            buf[n + 1:n + 1 + m] = targets     # the block may be rounded up to a whole page
+            buf.release()
+            with Pool(processes, _attach_shared, (shm.name, n, m)) as pool:
+                return pool.map(_bfs_shared, [(s, parents) for s in sources], chunksize)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def DFS(self, s, outgoing=True):
+        """Perform DFS starting at vertex id s and return the parent array.
+
+        Uses an explicit stack, so the depth of the search is not bounded by the
+        recursion limit. parent[s] is s and undiscovered vertices are mapped to -1.
+        """
+        offsets = self._offsets if outgoing else self._in_offsets
+        targets = self._targets if outgoing else self._in_targets
+        parent = array('q', [-1]) * self.vertex_count()
+        parent[s] = s
+        stack = [s]
+        cursor = [offsets[s]]       # next unexplored slot of each vertex on the stack
+        while stack:
+            u = stack[-1]
+            k = cursor[-1]
+            end = offsets[u + 1]
+            while k < end and parent[targets[k]] >= 0:
+                k += 1
+            if k == end:            # u is finished
+                stack.pop()
+                cursor.pop()
+            else:
+                w = targets[k]
+                cursor[-1] = k + 1
+                parent[w] = u
+                stack.append(w)
+                cursor.append(offsets[w])
+        return parent
+
+
+# -------------------- BFS kernel and process pool workers --------------------
+def _bfs_kernel(offsets, targets, s, parent, distance):
+    """Fill parent and/or distance arrays with a BFS over CSR arrays from vertex id s."""
+    seen = parent if parent is not None else distance
+    queue = array('q', [0]) * len(seen)     # each vertex is enqueued at most once
+    queue[0] = s
+    if parent is not None:
+        parent[s] = s
+    if distance is not None:
+        distance[s] = 0
+    head, tail = 0, 1
+    while head < tail:
+        u = queue[head]
+        head += 1
+        d = distance[u] + 1 if distance is not None else 0
+        for w in targets[offsets[u]:offsets[u + 1]]:
+            if seen[w] < 0:
+                if parent is not None:
+                    parent[w] = u
+                if distance is not None:
+                    distance[w] = d
+                queue[tail] = w
+                tail += 1
+
+
+_shared_graph = None    # (shm, offsets, targets) attached by each pool worker
+
+
+def _attach_shared(name, n, m):
+    """Pool initializer: map the shared adjacency arrays into this worker."""
+    global _shared_graph
+    shm = shared_memory.SharedMemory(name=name)
+    buf = shm.buf.cast('q')
+    _shared_graph = (shm, buf[:n + 1], buf[n + 1:n + 1 + m])
+
+
+def _bfs_shared(task):
+    """Pool task: return the distance (or parent) array of a BFS from task's source."""
+    s, parents = task
+    shm, offsets, targets = _shared_graph
+    result = array('q', [-1]) * (len(offsets) - 1)
+    _bfs_kernel(offsets, targets, s, result if parents else None, None if parents else result)
+    return result
@@ -1,10 +1,20 @@
+import csv
+import gc
+import mmap
+import struct
+
+import AdaptableHeapPriorityQueue
+import CSRGraph
+import UnionFind
+
+
 class Graph:
     """Representation of a simple graph using an adjacent map."""
 
     # -------------------- nested Vertex class --------------------
     class Vertex:
         """Lightweight vertex structure for a graph."""
-        __slots__ = '_element'
+        __slots__ = ('_element', '_index')
 
         def __init__(self, x):
             """Do not call constructor directly. Use Graph's insert_vertex(x)."""
@@ -51,13 +61,48 @@ class Graph:
         def __hash__(self):
             return hash((self._origin, self._destination))
 
-    def __init__(self, directed=False):
+    # -------------------- nested _EdgeView class --------------------
+    class _EdgeView:
+        """Live, read-only view of the edges of a graph."""
+        __slots__ = '_graph'
+
+        def __init__(self, graph):
+            self._graph = graph
+
+        def __len__(self):
+            return self._graph._edge_total
+
+        def __iter__(self):
+            """Generate each edge once, without building an intermediate set."""
+            if self._graph.is_directed():
+                for secondary_map in self._graph._outgoing.values():
+                    yield from secondary_map.values()
+            else:
+                # each undirected edge sits in two secondary maps; report it from its origin's
+                for u, secondary_map in self._graph._outgoing.items():
+                    for e in secondary_map.values():
+                        if e._origin is u:
+                            yield e
+
+        def __contains__(self, e):
+            secondary_map = self._graph._outgoing.get(getattr(e, '_origin', None))
+            return secondary_map is not None and secondary_map.get(e._destination) is e
+
+    def __init__(self, directed=False, stable_ids=False):
         """Created an empty graph (undirected by default).
 
-        Graph is directed if optional parameter is set to True"""
+        Graph is directed if optional parameter is set to True. If stable_ids is
+        True, the dense ids of remaining vertices never change on removal: a removed
+        vertex leaves a vacant id until compact() is called. Otherwise the last
+        vertex is moved into the freed id. Incident edges are deleted immediately
+        in both modes."""
         self._outgoing = {}
         # only create second map for directed graph; use alias for undirected
         self._incoming = {} if directed else self._outgoing
+        self._edge_total = 0        # maintained on insertion and removal
+        self._vertex_list = []      # dense id -> Vertex (None for a vacant id)
+        self._vacant = 0 if stable_ids else None    # number of vacant ids, if ids are stable
+        self._components = None     # UnionFind of vertices, built on first connectivity query
 
     def is_directed(self):
         """Return True if this is a directed graph; False is undirected.
@@ -75,16 +120,14 @@ class Graph:
 
     def edge_count(self):
         """Return the number of edges in the graph."""
-        total = sum(len(self._outgoing[v]) for v in self._outgoing)
-        # for undirected graphs, make sure not to double-count edges
-        return total if self.is_directed() else total // 2
+        return self._edge_total
 
     def edges(self):
-        """Return the iteration of all edges of the graph."""
-        result = set()  # avoid double-reporting edges of undirected graph
-        for secondary_map in self._outgoing.values():
-            result.update(secondary_map.values())   # secondary_map.values() are edges
-        return result
+        """Return a live view of all edges of the graph.
+
+        The view reflects later changes to the graph; each edge is reported once.
+        """
+        return self._EdgeView(self)
 
     def get_edge(self, u, v):
         """Return the edge from u to v, or None if not adjacent."""
@@ -114,30 +157,384 @@ class Graph:
     def insert_vertex(self, x=None):
         """Insert and return a new Vertex with element x."""
         v = self.Vertex(x)
+        v._index = len(self._vertex_list)
+        self._vertex_list.append(v)
         self._outgoing[v] = {}
         if self.is_directed():
             self._incoming[v] = {}
+        if self._components is not None:
+            self._components.make_group(v)
         return v    # Vertex class
 
     def insert_edge(self, u, v, x=None):
         """Insert and return a new Edge from u to v with auxiliary element x"""
         e = self.Edge(u, v, x)
+        if v not in self._outgoing[u]:      # otherwise existing edge is replaced
+            self._edge_total += 1
         self._outgoing[u][v] = e
         self._incoming[v][u] = e
+        if self._components is not None:
+            self._components.union(u, v)
         return e    # Edge class
 
+    # -------------------- removal --------------------
+    def remove_edge(self, e):
+        """Remove Edge e from the graph (raise ValueError if e is not in the graph)."""
+        u, v = e._origin, e._destination
+        secondary_map = self._outgoing.get(u)
+        if secondary_map is None or secondary_map.get(v) is not e:
+            raise ValueError('e does not belong to this graph')
+        del secondary_map[v]
+        self._incoming[v].pop(u, None)      # already gone for an undirected self-loop
+        self._edge_total -= 1
+        self._components = None             # union-find cannot split; rebuild on next query
+
+    def remove_vertex(self, v):
+        """Remove Vertex v and all its incident edges from the graph in O(deg(v)) time."""
+        outgoing = self._outgoing.pop(v)
+        for w in outgoing:
+            if w is not v:
+                del self._incoming[w][v]
+        removed = len(outgoing)
+        if self.is_directed():
+            incoming = self._incoming.pop(v)
+            for w in incoming:
+                if w is not v:
+                    del self._outgoing[w][v]
+            removed += len(incoming) - (v in incoming)  # self-loop was counted twice
+        self._edge_total -= removed
+        self._components = None
+        # release the dense id of v
+        i = v._index
+        if self._vacant is not None:
+            self._vertex_list[i] = None
+            self._vacant += 1
+        else:
+            last = self._vertex_list.pop()
+            if last is not v:
+                self._vertex_list[i] = last
+                last._index = i
+        v._index = None
+
+    def compact(self):
+        """Reclaim memory left behind by removals and renumber vertex ids densely.
+
+        Drops vacant ids, assigns ids 0..n-1 in current order, and rebuilds the
+        adjacency maps, since dictionaries do not shrink as entries are deleted.
+        """
+        vertex_list = [v for v in self._vertex_list if v is not None]
+        for i, v in enumerate(vertex_list):
+            v._index = i
+        self._vertex_list = vertex_list
+        if self._vacant is not None:
+            self._vacant = 0
+        directed = self.is_directed()
+        self._outgoing = {v: dict(m) for v, m in self._outgoing.items()}
+        self._incoming = {v: dict(m) for v, m in self._incoming.items()} if directed else self._outgoing
+
+    # -------------------- persistence --------------------
+    def save(self, path, elements=True):
+        """Write the graph to path in a compact, versioned binary format.
+
+        Vertices are stored by dense id with CSR adjacency (see CSRGraph.save);
+        if elements is True, vertex and edge elements are pickled into a side table.
+        """
+        snapshot = self.freeze()
+        if elements:
+            vertices = snapshot.vertices()
+            edge_elements = [e._element for v in vertices for e in self._outgoing[v].values()]
+            snapshot.save(path, [v._element for v in vertices], edge_elements)
+        else:
+            snapshot.save(path)
+
+    @classmethod
+    def load(cls, path):
+        """Create and return a graph from a file written by save.
+
+        For read-only queries, CSRGraph.load maps the file without building a graph.
+        Element side tables are unpickled, so only load files from trusted sources.
+        """
+        snapshot = CSRGraph.CSRGraph.load(path)
+        try:
+            vertex_elements, edge_elements = snapshot._side_table()
+            directed = snapshot.is_directed()
+            g = cls(directed)
+            n = snapshot.vertex_count()
+            if vertex_elements is None:
+                vertex_elements = [None] * n
+            vertex_map = {i: g.insert_vertex(x) for i, x in enumerate(vertex_elements)}
+            offsets = snapshot._offsets.tolist()
+            targets = snapshot._targets.tolist()
+
+            def edges():
+                for u in range(n):
+                    for k in range(offsets[u], offsets[u + 1]):
+                        v = targets[k]
+                        if directed or u <= v:  # undirected edges are stored at both endpoints
+                            yield u, v, edge_elements[k] if edge_elements is not None else None
+
+            g.insert_edges_from(edges(), vertex_map)
+        finally:
+            snapshot.close()
+        return g
+
+    # -------------------- connected components --------------------
+    def _component_index(self):
+        """Return the UnionFind of vertices, building it on first use.
+
+        Once built, the index is kept up to date by insert_vertex and insert_edge.
+        """
+        if self.is_directed():
+            raise ValueError('connectivity index requires an undirected graph')
+        if self._components is None:
+            components = UnionFind.UnionFind()
+            for v in self._outgoing:
+                components.make_group(v)
+            for u, secondary_map in self._outgoing.items():
+                for v in secondary_map:
+                    components.union(u, v)
+            self._components = components
+        return self._components
+
+    def connected(self, u, v):
+        """Return True if vertices u and v are in the same connected component."""
+        return self._component_index().same_group(u, v)
+
+    def component_of(self, v):
+        """Return the representative vertex of the connected component containing v."""
+        return self._component_index().find(v)
+
+    def component_count(self):
+        """Return the number of connected components of the graph."""
+        return self._component_index().group_count()
+
+    # -------------------- bulk construction --------------------
+    @classmethod
+    def from_edges(cls, edges, directed=False, vertex_map=None):
+        """Create and return a graph from (u, v) or (u, v, x) tuples of vertex keys.
+
+        See insert_edges_from for the meaning of the keys and of vertex_map.
+        """
+        g = cls(directed)
+        g.insert_edges_from(edges, vertex_map)
+        return g
+
+    def insert_edges_from(self, edges, vertex_map=None):
+        """Insert edges given as (u, v) or (u, v, x) tuples of external vertex keys.
+
+        vertex_map is a dictionary mapping keys to Vertex objects of this graph;
+        a key missing from it gets a new Vertex whose element is the key. The
+        (possibly new) dictionary is returned so later batches can share it.
+        """
+        if vertex_map is None:
+            vertex_map = {}
+        outgoing = self._outgoing
+        incoming = self._incoming
+        directed = self.is_directed()
+        Edge = self.Edge
+        components = self._components
+        vertex_list = self._vertex_list
+
+        def new_vertex(key):
+            w = vertex_map[key] = self.Vertex(key)
+            w._index = len(vertex_list)
+            vertex_list.append(w)
+            outgoing[w] = {}
+            if directed:
+                incoming[w] = {}
+            if components is not None:
+                components.make_group(w)
+            return w
+
+        added = 0
+        collecting = gc.isenabled()
+        gc.disable()        # new vertices and edges create no garbage cycles to collect
+        try:
+            for edge in edges:
+                u = vertex_map.get(edge[0])
+                if u is None:
+                    u = new_vertex(edge[0])
+                v = vertex_map.get(edge[1])
+                if v is None:
+                    v = new_vertex(edge[1])
+                e = Edge(u, v, edge[2] if len(edge) > 2 else None)
+                secondary_map = outgoing[u]
+                if v not in secondary_map:
+                    added += 1
+                secondary_map[v] = e
+                incoming[v][u] = e
+                if components is not None:
+                    components.union(u, v)
+        finally:
+            self._edge_total += added
+            if collecting:
+                gc.enable()
+        return vertex_map
+
+    @classmethod
+    def from_csv(cls, path, directed=False, delimiter=',', key=str, weight=None, header=False):
+        """Create and return a graph from a delimited text file of edges.
+
+        Each row holds two vertex keys, converted by key, and an optional third
+        column converted by weight (kept as a string if weight is None) that
+        becomes the edge element. The file is read one row at a time.
+        """
+        return cls.from_edges(cls._csv_edges(path, delimiter, key, weight, header), directed)
+
+    @classmethod
+    def from_binary(cls, path, directed=False, weighted=False):
+        """Create and return a graph from a binary edge file.
+
+        The file is a sequence of little-endian records of two int64 vertex keys,
+        followed by a float64 edge element if weighted is True. It is memory
+        mapped and decoded in fixed-size chunks.
+        """
+        return cls.from_edges(cls._binary_edges(path, weighted), directed)
+
+    @staticmethod
+    def _csv_edges(path, delimiter=',', key=str, weight=None, header=False):
+        """Generate edge tuples from the rows of a delimited text file."""
+        with open(path, newline='') as f:
+            rows = csv.reader(f, delimiter=delimiter)
+            if header:
+                next(rows, None)
+            for row in rows:
+                if len(row) > 2:
+                    yield key(row[0]), key(row[1]), row[2] if weight is None else weight(row[2])
+                elif len(row) == 2:
+                    yield key(row[0]), key(row[1])
+                elif row:
+                    raise ValueError('line %d: expected at least two columns' % rows.line_num)
+
+    @staticmethod
+    def _binary_edges(path, weighted=False, chunk_records=65536):
+        """Generate edge tuples from a memory-mapped binary edge file."""
+        fmt = '<qqd' if weighted else '<qq'
+        size = struct.calcsize(fmt)
+        with open(path, 'rb') as f:
+            if f.seek(0, 2) == 0:   # mmap cannot map an empty file
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = len(mm) - len(mm) % size     # ignore a truncated trailing record
+                step = size * chunk_records
+                for start in range(0, end, step):
+                    yield from struct.iter_unpack(fmt, mm[start:min(start + step, end)])
+
+    def freeze(self):
+        """Return a read-only CSRGraph snapshot of the graph.
+
+        Vertices are packed into dense integer ids and adjacency into flat arrays;
+        later changes to the graph are not reflected in the snapshot.
+        """
+        return CSRGraph.CSRGraph.from_graph(self)
+
+    # -------------------- traversal engine --------------------
+    DISCOVER = 'discover'       # vertex reached for the first time
+    FINISH = 'finish'           # all edges of vertex have been explored
+    TREE_EDGE = 'tree'          # edge used to discover a vertex
+    BACK_EDGE = 'back'          # DFS edge leading to a vertex still being explored
+
+    def traverse(self, s, discovered=None, breadth_first=False, target=None, predicate=None,
+                 max_depth=None, outgoing=True):
+        """Generate (event, vertex, edge) tuples of a DFS (or BFS) starting at Vertex s.
+
+        Events are DISCOVER and FINISH for vertices (edge is the discovery edge,
+        None for s), and TREE_EDGE and BACK_EDGE for edges (vertex is the one the
+        edge leads to). Back edges are only reported by DFS. The search uses an
+        explicit stack or queue, so its depth is not bounded by the recursion limit.
+
+        discovered is an optional dictionary mapping each vertex to the edge that
+        discovered it; vertices already in it are treated as visited. Traversal
+        stops right after the DISCOVER event of the target vertex, or of the first
+        vertex satisfying predicate. Vertices at max_depth hops are not expanded.
+        If graph is directed, outgoing=False follows incoming edges instead.
+        """
+        if discovered is None:
+            discovered = {}
+        if s not in discovered:
+            discovered[s] = None
+        search = self._bfs_events if breadth_first else self._dfs_events
+        return search(s, discovered, self._matcher(target, predicate), max_depth, outgoing)
+
+    @staticmethod
+    def _matcher(target, predicate):
+        """Return a function reporting whether a vertex ends the traversal (or None)."""
+        if target is None:
+            return predicate
+        if predicate is None:
+            return lambda v: v is target
+        return lambda v: v is target or predicate(v)
+
+    def _dfs_events(self, s, discovered, match, max_depth, outgoing):
+        """Generate traversal events of an iterative DFS (see traverse)."""
+        yield self.DISCOVER, s, discovered[s]
+        if match is not None and match(s):
+            return
+        if max_depth is not None and max_depth <= 0:
+            yield self.FINISH, s, discovered[s]
+            return
+        adj = self._outgoing if outgoing else self._incoming
+        active = {s}                                # vertices on the stack
+        stack = [(s, iter(adj[s].values()), 0)]     # (vertex, remaining edges, depth)
+        while stack:
+            u, edges, depth = stack[-1]
+            for e in edges:
+                v = e.opposite(u)
+                if v not in discovered:
+                    discovered[v] = e
+                    yield self.TREE_EDGE, v, e
+                    yield self.DISCOVER, v, e
+                    if match is not None and match(v):
+                        return
+                    if max_depth is None or depth + 1 < max_depth:
+                        active.add(v)
+                        stack.append((v, iter(adj[v].values()), depth + 1))
+                    else:
+                        yield self.FINISH, v, e
+                    break                           # continue with the new top of stack
+                elif v in active and e is not discovered[u]:
+                    yield self.BACK_EDGE, v, e
+            else:                                   # no edges left, u is finished
+                stack.pop()
+                active.discard(u)
+                yield self.FINISH, u, discovered[u]
+
+    def _bfs_events(self, s, discovered, match, max_depth, outgoing):
+        """Generate traversal events of a level-by-level BFS (see traverse)."""
+        yield self.DISCOVER, s, discovered[s]
+        if match is not None and match(s):
+            return
+        adj = self._outgoing if outgoing else self._incoming
+        level = [s]
+        depth = 0
+        while len(level) > 0:
+            expand = max_depth is None or depth < max_depth
+            next_level = []
+            for u in level:
+                if expand:
+                    for v, e in adj[u].items():
+                        if v not in discovered:
+                            discovered[v] = e
+                            yield self.TREE_EDGE, v, e
+                            yield self.DISCOVER, v, e
+                            if match is not None and match(v):
+                                return
+                            next_level.append(v)
+                yield self.FINISH, u, discovered[u]
+            level = next_level
+            depth += 1
+
     def DFS(self, u, discovered):
         """Perform DFS of the undiscovered portion of Graph g starting at Vertex u.
 
         discovered is a dictionary mapping each vertex to the edge that was used to
         discovered it during the DFS. (u should be "discovered" prior to the call.
         Newly discovered vertices will be added to the dictionary as a result.)
+        The search is iterative, so long paths do not hit the recursion limit.
         """
-        for e in self.incident_edges(u):   # for every outgoing edge from u
-            v = e.opposite(u)
-            if v not in discovered:
-                discovered[v] = e
-                self.DFS(v, discovered)
+        discovered.setdefault(u, None)     # the recursive version did not require u to be mapped
+        for _ in self._dfs_events(u, discovered, None, None, True):
+            pass
 
     def BFS(self, s, discovered):
         """Perform BFS of the undiscovered portion of Graph g starting at Vertex s.
@@ -156,3 +553,310 @@ class Graph:
                         discovered[v] = e
                         next_level.append(v)
             level = next_level
+
+    def construct_path(self, u, v, discovered):
+        """Return the list of vertices on the discovery path from u to v.
+
+        discovered is a dictionary produced by a traversal starting at u.
+        Return an empty list if v was not discovered.
+        """
+        path = []
+        if v in discovered:
+            path.append(v)
+            walk = v
+            while walk is not u:
+                e = discovered[walk]
+                if e is None:           # reached another traversal root
+                    return []
+                walk = e.opposite(walk)
+                path.append(walk)
+            path.reverse()
+        return path
+
+    def find_path(self, s, target=None, predicate=None, breadth_first=True, max_depth=None):
+        """Return a list of vertices from s to target (or first vertex satisfying predicate).
+
+        The traversal stops as soon as the goal is discovered; with breadth_first
+        the path has the fewest edges. Return None if no goal is reachable.
+        """
+        match = self._matcher(target, predicate)
+        if match is None:
+            raise ValueError('target or predicate must be given')
+        discovered = {s: None}
+        for event, v, e in self.traverse(s, discovered, breadth_first, target, predicate, max_depth):
+            if event is self.DISCOVER and match(v):
+                return self.construct_path(s, v, discovered)
+        return None
+
+    # -------------------- directed graph structure --------------------
+    def topological_sort(self):
+        """Return a list of vertices of the directed graph in topological order.
+
+        Uses Kahn's algorithm on the in-degrees of the incoming map. If the graph
+        has a cycle, the result will not include all vertices.
+        """
+        if not self.is_directed():
+            raise ValueError('topological sort requires a directed graph')
+        topo = []
+        incount = {}        # number of incoming edges from vertices not yet in topo
+        ready = []          # vertices with no remaining constraints
+        for u, secondary_map in self._incoming.items():
+            incount[u] = len(secondary_map)
+            if incount[u] == 0:
+                ready.append(u)
+        while len(ready) > 0:
+            u = ready.pop()
+            topo.append(u)
+            for v in self._outgoing[u]:
+                incount[v] -= 1
+                if incount[v] == 0:
+                    ready.append(v)
+        return topo
+
+    def is_acyclic(self):
+        """Return True if the directed graph has no cycle."""
+        return len(self.topological_sort()) == self.vertex_count()
+
+    def strongly_connected_components(self):
+        """Return a list of strongly connected components, each a list of vertices.
+
+        Uses an iterative version of Tarjan's algorithm, so it runs in linear time
+        without recursion. Components are listed in reverse topological order.
+        """
+        index = {}          # discovery number of each vertex
+        low = {}            # lowest discovery number reachable from the vertex's subtree
+        stack = []          # vertices of components not yet emitted
+        on_stack = set()
+        components = []
+        for root in self._outgoing:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._outgoing[root]))]     # explicit DFS stack
+            while work:
+                u, neighbours = work[-1]
+                for w in neighbours:
+                    if w not in index:
+                        index[w] = low[w] = len(index)
+                        stack.append(w)
+                        on_stack.add(w)
+                        work.append((w, iter(self._outgoing[w])))
+                        break
+                    elif w in on_stack and index[w] < low[u]:
+                        low[u] = index[w]
+                else:               # u is finished
+                    work.pop()
+                    if work and low[u] < low[work[-1][0]]:
+                        low[work[-1][0]] = low[u]
+                    if low[u] == index[u]:  # u is the root of a component
+                        component = []
+                        while True:
+                            w = stack.pop()
+                            on_stack.discard(w)
+                            component.append(w)
+                            if w is u:
+                                break
+                        components.append(component)
+        return components
+
+    def condensation(self):
+        """Return (dag, component_of) for the strongly connected components.
+
+        dag is a directed Graph with one vertex per component (its element is the
+        list of original vertices), inserted in topological order, and one edge
+        for each pair of components joined by at least one edge. component_of maps
+        each original vertex to its vertex in dag.
+        """
+        dag = type(self)(directed=True)
+        component_of = {}
+        for component in reversed(self.strongly_connected_components()):
+            c = dag.insert_vertex(component)
+            for v in component:
+                component_of[v] = c
+        for u, secondary_map in self._outgoing.items():
+            cu = component_of[u]
+            for v in secondary_map:
+                cv = component_of[v]
+                if cu is not cv and dag.get_edge(cu, cv) is None:
+                    dag.insert_edge(cu, cv)
+        return dag, component_of
+
+    # -------------------- weighted shortest paths --------------------
+    def Dijkstra(self, s, t=None):
+        """Compute shortest-path distances from Vertex s, using edge elements as weights.
+
+        Return (distance, discovered) dictionaries for the vertices whose distance
+        is final; discovered maps each of them to the last edge of its shortest
+        path (None for s). If target t is given, the search stops as soon as t's
+        distance is final. Weights must be nonnegative.
+        """
+        return self._best_first(s, t, None)
+
+    def A_star(self, s, t=None, heuristic=None):
+        """Compute shortest-path distances from s towards target t with A* search.
+
+        heuristic(v, t) must return a lower bound on the distance from v to t.
+        Return (distance, discovered) dictionaries as Dijkstra does; without a
+        target (or heuristic) this is Dijkstra's algorithm.
+        """
+        return self._best_first(s, t, heuristic if t is not None else None)
+
+    def _best_first(self, s, t, heuristic):
+        """Run Dijkstra's algorithm from s, guided by heuristic if given."""
+        adj = self._outgoing
+        d = {s: 0}                  # best distance found so far
+        discovered = {s: None}
+        cloud = {}                  # vertices with final distance
+        pq = AdaptableHeapPriorityQueue.AdaptableHeapPriorityQueue()
+        pqlocator = {s: pq.add(0, s)}
+        while not pq.is_empty():
+            key, u = pq.remove_min()
+            del pqlocator[u]
+            cloud[u] = d[u]
+            if u is t:
+                break
+            for v, e in adj[u].items():
+                wgt = d[u] + e.element()
+                if v not in d or wgt < d[v]:    # relaxation
+                    d[v] = wgt
+                    discovered[v] = e
+                    f = wgt if heuristic is None else wgt + heuristic(v, t)
+                    if v in pqlocator:
+                        pq.update(pqlocator[v], f, v)
+                    else:                       # reopens v if heuristic is inconsistent
+                        cloud.pop(v, None)
+                        pqlocator[v] = pq.add(f, v)
+        if len(cloud) < len(discovered):
+            discovered = {v: discovered[v] for v in cloud}
+        return cloud, discovered
+
+    def bidirectional_Dijkstra(self, s, t=None):
+        """Compute the shortest path from s to t searching from both ends at once.
+
+        Return (distance, discovered) dictionaries whose discovery edges lead from
+        s to t along a shortest path (distance[t] is its length). Without a
+        target this is Dijkstra's algorithm.
+        """
+        if t is None or s is t:
+            return self.Dijkstra(s, t)
+        adj = (self._outgoing, self._incoming)  # backward search follows incoming edges
+        d = ({s: 0}, {t: 0})
+        discovered = ({s: None}, {t: None})
+        pq = (AdaptableHeapPriorityQueue.AdaptableHeapPriorityQueue(),
+              AdaptableHeapPriorityQueue.AdaptableHeapPriorityQueue())
+        pqlocator = ({s: pq[0].add(0, s)}, {t: pq[1].add(0, t)})
+        best = float('inf')
+        meet = None
+        while not pq[0].is_empty() and not pq[1].is_empty():
+            if pq[0].min()[0] + pq[1].min()[0] >= best:
+                break                           # no shorter path can be found
+            side = 0 if len(pq[0]) <= len(pq[1]) else 1     # expand the smaller frontier
+            other = 1 - side
+            key, u = pq[side].remove_min()
+            del pqlocator[side][u]
+            for v, e in adj[side][u].items():
+                wgt = key + e.element()
+                if v not in d[side] or wgt < d[side][v]:
+                    d[side][v] = wgt
+                    discovered[side][v] = e
+                    if v in pqlocator[side]:
+                        pq[side].update(pqlocator[side][v], wgt, v)
+                    else:
+                        pqlocator[side][v] = pq[side].add(wgt, v)
+                if v in d[other] and d[side][v] + d[other][v] < best:
+                    best = d[side][v] + d[other][v]
+                    meet = v
+        if meet is None:
+            return {s: 0}, {s: None}
+        # splice backward half of the path onto the forward discovery map
+        distance = {v: d[0][v] for v in self.construct_path(s, meet, discovered[0])}
+        forward = {v: discovered[0][v] for v in distance}
+        walk = meet
+        while walk is not t:
+            e = discovered[1][walk]
+            nxt = e.opposite(walk)
+            distance[nxt] = distance[walk] + e.element()
+            forward[nxt] = e
+            walk = nxt
+        return distance, forward
+
+    def shortest_path(self, s, t, algorithm='dijkstra', heuristic=None):
+        """Return (length, vertices, edges) of a shortest path from s to t.
+
+        algorithm is one of 'dijkstra', 'bidirectional' or 'astar' (which uses
+        heuristic(v, t)). Return None if t is not reachable from s.
+        """
+        if algorithm == 'dijkstra':
+            distance, discovered = self.Dijkstra(s, t)
+        elif algorithm == 'bidirectional':
+            distance, discovered = self.bidirectional_Dijkstra(s, t)
+        elif algorithm == 'astar':
+            distance, discovered = self.A_star(s, t, heuristic)
+        else:
+            raise ValueError('unknown algorithm: ' + repr(algorithm))
+        if t not in distance:
+            return None
+        vertices = self.construct_path(s, t, discovered)
+        return distance[t], vertices, [discovered[v] for v in vertices[1:]]
+
+    # -------------------- minimum spanning trees --------------------
+    def MST_PrimJarnik(self):
+        """Compute a minimum spanning forest of the undirected weighted graph.
+
+        Grows one tree at a time with an adaptable priority queue keyed by the
+        cheapest known connecting edge, so the queue never holds more than one
+        entry per vertex. Return (edges, total) where edges is the list of tree edges.
+        """
+        if self.is_directed():
+            raise ValueError('minimum spanning tree requires an undirected graph')
+        tree = []
+        total = 0
+        d = {}              # d[v] is bound on weight of edge connecting v to the tree
+        done = set()        # vertices already in the forest
+        for root in self._outgoing:
+            if root in done:
+                continue
+            pq = AdaptableHeapPriorityQueue.AdaptableHeapPriorityQueue()
+            pqlocator = {root: pq.add(0, (root, None))}
+            while not pq.is_empty():
+                key, (u, edge) = pq.remove_min()
+                del pqlocator[u]
+                done.add(u)
+                if edge is not None:
+                    tree.append(edge)
+                    total += key
+                for v, e in self._outgoing[u].items():
+                    if v not in done:
+                        wgt = e.element()
+                        if v not in pqlocator:
+                            d[v] = wgt
+                            pqlocator[v] = pq.add(wgt, (v, e))
+                        elif wgt < d[v]:            # better edge to v?
+                            d[v] = wgt
+                            pq.update(pqlocator[v], wgt, (v, e))
+        return tree, total
+
+    def MST_Kruskal(self):
+        """Compute a minimum spanning forest of the undirected weighted graph.
+
+        Considers edges in increasing weight from a sorted edge list and joins
+        clusters with union-find, stopping once the tree is complete. Return
+        (edges, total) where edges is the list of tree edges.
+        """
+        if self.is_directed():
+            raise ValueError('minimum spanning tree requires an undirected graph')
+        tree = []
+        total = 0
+        forest = UnionFind.UnionFind()
+        for v in self._outgoing:
+            forest.make_group(v)
+        size = self.vertex_count()
+        for e in sorted(self.edges(), key=self.Edge.element):
+            if forest.union(e._origin, e._destination):     # endpoints in different trees
+                tree.append(e)
+                total += e._element
+                if len(tree) == size - 1:
+                    break
+        return tree, total
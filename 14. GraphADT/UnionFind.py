@@ -0,0 +1,59 @@
+class UnionFind:
+    """Disjoint-set forest over hashable elements, with union by rank and path compression."""
+
+    def __init__(self):
+        """Create an empty structure with no groups."""
+        self._parent = {}
+        self._rank = {}
+        self._groups = 0
+
+    def __len__(self):
+        """Return the number of elements in the structure."""
+        return len(self._parent)
+
+    def __contains__(self, e):
+        """Return True if element e belongs to some group."""
+        return e in self._parent
+
+    def group_count(self):
+        """Return the number of disjoint groups."""
+        return self._groups
+
+    def make_group(self, e):
+        """Make a new group containing only element e (no effect if e is present)."""
+        if e not in self._parent:
+            self._parent[e] = e
+            self._rank[e] = 0
+            self._groups += 1
+
+    def find(self, e):
+        """Return the leader of the group containing element e (raise KeyError if absent)."""
+        parent = self._parent
+        leader = e
+        while parent[leader] is not leader:
+            leader = parent[leader]
+        while e is not leader:          # path compression
+            parent[e], e = leader, parent[e]
+        return leader
+
+    def union(self, a, b):
+        """Merge the groups containing elements a and b.
+
+        Return True if they were different groups, False if already merged.
+        """
+        a = self.find(a)
+        b = self.find(b)
+        if a is b:
+            return False
+        if self._rank[a] < self._rank[b]:
+            a, b = b, a
+        self._parent[b] = a             # lower rank tree goes under higher rank
+        if self._rank[a] == self._rank[b]:
+            self._rank[a] += 1
+        del self._rank[b]               # rank only matters for leaders
+        self._groups -= 1
+        return True
+
+    def same_group(self, a, b):
+        """Return True if elements a and b are in the same group."""
+        return self.find(a) is self.find(b)
@@ -46,13 +46,14 @@ class BinaryTree(Tree.Tree):
 
     def _subtree_inorder(self, p):
         """Generate an inorder iteration of positions in subtree rooted at p."""
-        if self.left(p) is not None:
-            for other in self._subtree_inorder(self.left(p)):
-                yield other
-        yield p
-        if self.right(p) is not None:
-            for other in self._subtree_inorder(self.right(p)):
-                yield other
+        stack = []
+        while stack or p is not None:
+            while p is not None:        # push path to leftmost position
+                stack.append(p)
+                p = self.left(p)
+            p = stack.pop()
+            yield p
+            p = self.right(p)
 
     # override inherited version to make inorder the default.
     def positions(self):
@@ -29,6 +29,9 @@ class LinkedBinaryTree(BinaryTree.BinaryTree):
             """Return True if other Position represents the same location."""
             return type(other) is type(self) and other.node is self.node
 
+        def __hash__(self):
+            return hash(self.node)      # consistent with __eq__
+
     def _validate(self, p):
         """Return associated node, if Position is valid."""
         if not isinstance(p, self.Position):
@@ -93,6 +96,7 @@ class LinkedBinaryTree(BinaryTree.BinaryTree):
             raise ValueError('Root exists')
         self._size = 1
         self._root = self._Node(e)
+        self._invalidate_metrics()
         return self._make_position(self._root)
 
     def _add_left(self, p, e):
@@ -106,6 +110,7 @@ class LinkedBinaryTree(BinaryTree.BinaryTree):
             raise ValueError('Left child exists')
         self._size += 1
         node._left = self._Node(e, node)
+        self._invalidate_metrics()
         return self._make_position(node._left)
 
     def _add_right(self, p, e):
@@ -119,6 +124,7 @@ class LinkedBinaryTree(BinaryTree.BinaryTree):
             raise ValueError('Right child exists')
         self._size += 1
         node._right = self._Node(e, node)
+        self._invalidate_metrics()
         return self._make_position(node._right)
 
     def _replace(self, p, e):
@@ -150,6 +156,7 @@ class LinkedBinaryTree(BinaryTree.BinaryTree):
                 parent._right = child
         self._size -= 1
         node._parent = node
+        self._invalidate_metrics()
         return node._element
 
     def _attach(self, p, t1, t2):
@@ -160,13 +167,16 @@ class LinkedBinaryTree(BinaryTree.BinaryTree):
         if not type(self) is type(t1) is type(t2):
             raise ValueError('Tree types must match')
         self._size += len(t1) + len(t2)
+        self._invalidate_metrics()
         if not t1.is_empty():
             t1._root._parent = node
             node._left = t1._root
             t1._root = None
             t1._size = 0
-        if not t2.isempty():
+            t1._invalidate_metrics()
+        if not t2.is_empty():
             t2._root._parent = node
             node._right = t2._root
             t2._root = None
             t2._size = 0
+            t2._invalidate_metrics()
@@ -56,17 +56,20 @@ class Tree:
 
     def depth(self, p):
         """Return the number of levels separating Position p from the root."""
-        if self.is_root(p):
-            return 0
-        else:
-            return 1 + self.depth(self.parent(p))
+        d = 0
+        while not self.is_root(p):      # walk up, without recursion
+            p = self.parent(p)
+            d += 1
+        return d
 
     def _height(self, p):
         """Return the height of the subtree rooted at Position p."""
-        if self.is_leaf(p):
-            return 0
-        else:
-            return 1 + max(self._height(c) for c in self.children(p))
+        h = 0
+        level = list(self.children(p))
+        while level:                    # count levels below p, one level at a time
+            h += 1
+            level = [c for q in level for c in self.children(q)]
+        return h
 
     def height(self, p = None):
         """Return the height of the subtree rooted at Position p.
@@ -74,9 +77,50 @@ class Tree:
         If p is None, return the height of the entire tree.
         """
         if p is None:
+            if self._metrics is not None:
+                return self._metrics[0]     # cached by compute_metrics
             p = self.root()
         return self._height(p)
 
+    _metrics = None     # result cached by compute_metrics, if any
+
+    def compute_metrics(self, cache=False):
+        """Return (height, depth, size) of the whole tree in one O(n) pass.
+
+        depth and size are dicts mapping every Position to its depth and to
+        the number of positions in its subtree. If cache is True, the result
+        is kept and returned again until the tree's shape changes.
+        """
+        if self._metrics is not None:
+            return self._metrics
+        height, depth, size = 0, {}, {}
+        if not self.is_empty():
+            root = self.root()
+            depth[root] = 0
+            size[root] = 1
+            stack = [(root, iter(self.children(root)))]
+            while stack:
+                p, pending = stack[-1]
+                for c in pending:       # descend into the next child, if any
+                    depth[c] = depth[p] + 1
+                    size[c] = 1
+                    if depth[c] > height:
+                        height = depth[c]
+                    stack.append((c, iter(self.children(c))))
+                    break
+                else:                   # all children done: p's subtree size is final
+                    stack.pop()
+                    if stack:
+                        size[stack[-1][0]] += size[p]
+        result = (height, depth, size)
+        if cache:
+            self._metrics = result
+        return result
+
+    def _invalidate_metrics(self):
+        """Discard cached metrics; subclasses call this whenever the tree's shape changes."""
+        self._metrics = None
+
     def __iter__(self):
         """Generate an iteration of the tree's elements."""
         for p in self.positions():
@@ -90,10 +134,11 @@ class Tree:
 
     def _subtree_preorder(self, p):
         """Generate a preorder iteration of positions in subtree rooted at p."""
-        yield p
-        for c in self.children(p):
-            for other in self._subtree_preorder(c):
-                yield other
+        stack = [p]
+        while stack:
+            p = stack.pop()
+            yield p
+            stack.extend(reversed(list(self.children(p))))  # leftmost child on top
 
     def positions(self):
         """Generate an iteration of the tree's positions."""
@@ -107,13 +152,18 @@ class Tree:
 
     def _subtree_postorder(self, p):
         """Generate a postorder iteration of positions in subtree rooted at p."""
-        for c in self.children(p):
-            for other in self._subtree_preorder(c):
-                yield other
-        yield p
+        stack = [(p, iter(self.children(p)))]
+        while stack:
+            p, pending = stack[-1]
+            for c in pending:           # descend into the next child, if any
+                stack.append((c, iter(self.children(c))))
+                break
+            else:                       # all children done
+                stack.pop()
+                yield p
 
     def breadthfirst(self):
-        """Generate a postorder iteration of positions in the tree."""
+        """Generate a breadth-first iteration of positions in the tree."""
         if not self.is_empty():
             fringe = LinkedQueue.LinkedQueue()
             fringe.enqueue(self.root())